@@ -2,10 +2,19 @@ from flask import Flask
 
 from src.config.configuracao import Configuracao
 from src.routes.rotas import api_blueprint
+from src.services.agendador_atualizacao import agendadorAtualizacao
+from src.utils.compressao import registrarCompressao
+from src.utils.prazo import registrarPrazo
 
 app = Flask(__name__)
 
 app.register_blueprint(api_blueprint)
+registrarCompressao(app)
+registrarPrazo(app)
+
+# Cada worker do gunicorn inicia a sua thread; só o líder eleito vai ao site da Embrapa
+if Configuracao.AGENDADOR_HABILITADO:
+    agendadorAtualizacao.iniciar()
 
 if __name__ == '__main__':
     app.run(host=Configuracao.HOST, port=Configuracao.PORT, debug=Configuracao.DEBUG)
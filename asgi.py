@@ -0,0 +1,5 @@
+"""Entrada ASGI da API: uvicorn asgi:app --workers 4 (ou SERVIDOR=asgi ./run.sh)."""
+from app import app as appFlask
+from src.routes.rotas_assincronas import AppAssincrono
+
+app = AppAssincrono(appFlask)
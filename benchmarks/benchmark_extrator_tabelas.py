@@ -0,0 +1,95 @@
+"""Compara o tempo de extração por página: BeautifulSoup/html.parser x lxml.
+
+Uso:
+    python benchmarks/benchmark_extrator_tabelas.py [arquivo.html ...] [--repeticoes N]
+
+Sem arquivos, gera uma página sintética no formato do vitibrasil (tabela de
+exportação com ~140 países e o restante do layout do site).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.extrator_tabelas import extrairLinhas  # noqa: E402
+
+
+def gerarPaginaSintetica(quantidadeLinhas: int = 140) -> bytes:
+    linhas = ''.join(
+        f'<tr><td class="tb_subitem">\n\t\t\tPaís {i}\t\t</td>'
+        f'<td class="tb_subitem">{i * 1234:,}</td><td class="tb_subitem">{i * 987:,}</td></tr>\n'
+        for i in range(quantidadeLinhas)
+    ).replace(',', '.')
+    menu = ''.join(
+        f'<li><a href="index.php?opcao=opt_0{i % 7}">Item {i}</a></li>' for i in range(300)
+    )
+    return (
+        '<html><head><meta charset="utf-8"><title>Vitibrasil</title></head><body>'
+        f'<div id="menu"><ul>{menu}</ul></div>'
+        '<table class="tb_base tb_header no_print"><tr><td><a>DOWNLOAD</a></td></tr></table>'
+        '<table class="tb_base tb_dados"><thead><tr><th>Países</th><th>Quantidade (Kg)</th>'
+        f'<th>Valor (US$)</th></tr></thead><tbody>{linhas}</tbody>'
+        '<tfoot class="tb_total"><tr><td>Total</td><td>1.000</td><td>2.000</td></tr></tfoot>'
+        '</table>'
+        '</body></html>'
+    ).encode('utf-8')
+
+
+def extrairComBeautifulSoup(conteudo: bytes) -> list:
+    # Caminho anterior dos serviços coletarDados*
+    soup = BeautifulSoup(conteudo, 'html.parser')
+    linhas = []
+    for tabela in soup.find_all('table', class_='tb_base tb_dados'):
+        for linha in tabela.find_all('tr'):
+            colunas = linha.find_all('td')
+            if colunas:
+                linhas.append((
+                    [coluna.text.strip() for coluna in colunas],
+                    'tb_item' in colunas[0].get('class', [])
+                ))
+    return linhas
+
+
+def medir(funcao, conteudo: bytes, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(conteudo)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('arquivos', nargs='*')
+    parser.add_argument('--repeticoes', type=int, default=50)
+    argumentos = parser.parse_args()
+
+    paginas = [(caminho, open(caminho, 'rb').read()) for caminho in argumentos.arquivos]
+    if not paginas:
+        paginas = [('sintetica', gerarPaginaSintetica())]
+
+    for nome, conteudo in paginas:
+        antes = extrairComBeautifulSoup(conteudo)
+        depois = [(linha.celulas, linha.ehPai) for linha in extrairLinhas(conteudo)]
+        if antes != depois:
+            print(f"{nome}: AVISO - as extrações divergem ({len(antes)} x {len(depois)} linhas)")
+
+        tempoBs4 = medir(extrairComBeautifulSoup, conteudo, argumentos.repeticoes)
+        tempoLxml = medir(extrairLinhas, conteudo, argumentos.repeticoes)
+        print(
+            f"{nome}: {len(conteudo) / 1024:.1f} KiB, {len(depois)} linhas | "
+            f"html.parser {tempoBs4:.2f} ms | lxml {tempoLxml:.2f} ms | "
+            f"{tempoBs4 / tempoLxml:.1f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,12 @@
 if [ "$DEBUG" = "true" ] || [ "$DEBUG" = "True" ]; then
     echo "Executando em modo de desenvolvimento..."
     python app.py
+elif [ "$SERVIDOR" = "asgi" ]; then
+    echo "Executando em modo de produção com Uvicorn (ASGI)..."
+    uvicorn asgi:app --host ${HOST:-0.0.0.0} \
+                     --port ${PORT:-5000} \
+                     --workers ${WORKERS:-4} \
+                     --timeout-keep-alive 5
 else
     echo "Executando em modo de produção com Gunicorn..."
     gunicorn --bind ${HOST:-0.0.0.0}:${PORT:-5000} \
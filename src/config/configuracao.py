@@ -19,6 +19,14 @@ class Configuracao:
     SUBOPCAO_PROCESSAMENTO_PADRAO = os.getenv('SUBOPCAO_PROCESSAMENTO_PADRAO', 'subopt_03')
     SUBOPCAO_IMPORTACAO_PADRAO = os.getenv('SUBOPCAO_IMPORTACAO_PADRAO', 'subopt_03')
     SUBOPCAO_EXPORTACAO_PADRAO = os.getenv('SUBOPCAO_EXPORTACAO_PADRAO', 'subopt_03')
+    # Subopções existentes no site para cada opção (produção e comercialização não têm)
+    SUBOPCOES_POR_OPCAO = {
+        OPCAO_PRODUCAO: (),
+        OPCAO_PROCESSAMENTO: ('subopt_01', 'subopt_02', 'subopt_03', 'subopt_04'),
+        OPCAO_COMERCIALIZACAO: (),
+        OPCAO_IMPORTACAO: ('subopt_01', 'subopt_02', 'subopt_03', 'subopt_04', 'subopt_05'),
+        OPCAO_EXPORTACAO: ('subopt_01', 'subopt_02', 'subopt_03', 'subopt_04'),
+    }
     
     PRODUTOS_IGNORADOS = os.getenv('PRODUTOS_IGNORADOS', 'Dados da Vitivinicultura,DOWNLOAD').split(',')
     PROCESSOS_IGNORADOS = os.getenv('PROCESSOS_IGNORADOS', 'Dados da Vitivinicultura,DOWNLOAD').split(',')
@@ -29,3 +37,94 @@ class Configuracao:
     TIMEOUT = int(os.getenv('TIMEOUT', 120))
     WORKERS = int(os.getenv('WORKERS', 4))
     THREADS = int(os.getenv('THREADS', 2))
+
+    CACHE_HABILITADO = os.getenv('CACHE_HABILITADO', 'True').lower() == 'true'
+    CACHE_TAMANHO_MAXIMO = int(os.getenv('CACHE_TAMANHO_MAXIMO', 512))
+    CACHE_RESPOSTAS_TAMANHO_MAXIMO = int(os.getenv('CACHE_RESPOSTAS_TAMANHO_MAXIMO', 256))
+    CACHE_TTL_PADRAO = int(os.getenv('CACHE_TTL_PADRAO', 21600))
+    CACHE_TTL_POR_OPCAO = {
+        opcao.strip(): int(ttl)
+        for opcao, ttl in (
+            item.split(':') for item in os.getenv(
+                'CACHE_TTL_POR_OPCAO',
+                'opt_02:86400,opt_03:86400,opt_04:86400,opt_05:43200,opt_06:43200'
+            ).split(',') if item
+        )
+    }
+    CACHE_DIRETORIO = os.getenv('CACHE_DIRETORIO', '.cache')
+    CACHE_BACKEND_PERSISTENTE = os.getenv('CACHE_BACKEND_PERSISTENTE', 'sqlite').lower()
+    CACHE_SQLITE_CAMINHO = os.getenv(
+        'CACHE_SQLITE_CAMINHO', os.path.join(CACHE_DIRETORIO, 'embrapa.sqlite3')
+    )
+    CACHE_PERSISTENTE_IDADE_MAXIMA = int(os.getenv('CACHE_PERSISTENTE_IDADE_MAXIMA', 604800))
+    # Cópias vencidas: servidas na hora enquanto revalidam (até TTL + janela) ou se a coleta falhar
+    CACHE_OBSOLETO_REVALIDANDO = int(os.getenv('CACHE_OBSOLETO_REVALIDANDO', 86400))
+    CACHE_OBSOLETO_SE_ERRO = int(
+        os.getenv('CACHE_OBSOLETO_SE_ERRO', CACHE_PERSISTENTE_IDADE_MAXIMA)
+    )
+    CACHE_REVALIDACAO_CONCORRENCIA = int(os.getenv('CACHE_REVALIDACAO_CONCORRENCIA', 2))
+    CACHE_REVALIDACAO_ESPERA_APOS_FALHA = float(
+        os.getenv('CACHE_REVALIDACAO_ESPERA_APOS_FALHA', 60)
+    )
+    COLETA_TRAVA_ENTRE_WORKERS = os.getenv('COLETA_TRAVA_ENTRE_WORKERS', 'True').lower() == 'true'
+    COLETA_TRAVA_TIMEOUT = float(os.getenv('COLETA_TRAVA_TIMEOUT', 60))
+
+    # O orçamento total (conexão + leitura, somando as retentativas) deve caber
+    # no TIMEOUT do gunicorn
+    HTTP_TIMEOUT_CONEXAO = float(os.getenv('HTTP_TIMEOUT_CONEXAO', 5))
+    HTTP_TIMEOUT_LEITURA = float(os.getenv('HTTP_TIMEOUT_LEITURA', max(1, TIMEOUT // 6)))
+    HTTP_RETENTATIVAS = int(os.getenv('HTTP_RETENTATIVAS', 2))
+    HTTP_BACKOFF = float(os.getenv('HTTP_BACKOFF', 0.5))
+    HTTP_POOL_CONEXOES = int(os.getenv('HTTP_POOL_CONEXOES', 4))
+    HTTP_POOL_TAMANHO = int(os.getenv('HTTP_POOL_TAMANHO', max(THREADS, 10)))
+    HTTP_USER_AGENT = os.getenv('HTTP_USER_AGENT', 'fiaptechchallenge-api-embrapa')
+    # Orçamento por requisição para idas ao site (todas as coletas da requisição somadas)
+    HTTP_PRAZO_REQUISICAO = float(os.getenv('HTTP_PRAZO_REQUISICAO', max(1, TIMEOUT // 4)))
+    # Intervalos de anos ganham um prazo por rodada de coletas simultâneas,
+    # até este teto (< TIMEOUT)
+    HTTP_PRAZO_INTERVALO_MAXIMO = float(
+        os.getenv('HTTP_PRAZO_INTERVALO_MAXIMO', max(HTTP_PRAZO_REQUISICAO, TIMEOUT * 3 // 4))
+    )
+
+    # Disjuntor (circuit breaker) do site da Embrapa, por worker
+    DISJUNTOR_JANELA = int(os.getenv('DISJUNTOR_JANELA', 20))
+    DISJUNTOR_MINIMO_CHAMADAS = int(os.getenv('DISJUNTOR_MINIMO_CHAMADAS', 5))
+    DISJUNTOR_TAXA_FALHA = float(os.getenv('DISJUNTOR_TAXA_FALHA', 0.5))
+    DISJUNTOR_LIMITE_LENTIDAO = float(os.getenv('DISJUNTOR_LIMITE_LENTIDAO', 10))
+    DISJUNTOR_TEMPO_ABERTO = float(os.getenv('DISJUNTOR_TEMPO_ABERTO', 30))
+    DISJUNTOR_SONDAS = int(os.getenv('DISJUNTOR_SONDAS', 1))
+
+    COMPRESSAO_TAMANHO_MINIMO = int(os.getenv('COMPRESSAO_TAMANHO_MINIMO', 1024))
+    COMPRESSAO_NIVEL_GZIP = int(os.getenv('COMPRESSAO_NIVEL_GZIP', 6))
+    COMPRESSAO_NIVEL_BROTLI = int(os.getenv('COMPRESSAO_NIVEL_BROTLI', 5))
+    # Respostas NDJSON saem em chunks de até este tamanho (e ao fim de cada ano)
+    NDJSON_TAMANHO_BLOCO = int(os.getenv('NDJSON_TAMANHO_BLOCO', 65536))
+
+    COLETA_CONCORRENCIA_MAXIMA = int(os.getenv('COLETA_CONCORRENCIA_MAXIMA', 4))
+    INTERVALO_ANOS_MAXIMO = int(os.getenv('INTERVALO_ANOS_MAXIMO', 60))
+    # Primeiro ano das séries de /serie quando 'ano_inicio' não é informado
+    SERIE_ANO_INICIAL = int(os.getenv('SERIE_ANO_INICIAL', 1970))
+    COLETA_ASSINCRONA_CONCORRENCIA = int(os.getenv('COLETA_ASSINCRONA_CONCORRENCIA', 8))
+    COLETA_ASSINCRONA_REQUISICOES_POR_SEGUNDO = float(
+        os.getenv('COLETA_ASSINCRONA_REQUISICOES_POR_SEGUNDO', 4)
+    )
+
+    # Modo ASGI (uvicorn asgi:app): idas ao site no event loop, renderização em threads
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', max(THREADS * 4, 8)))
+    ASGI_COLETA_CONCORRENCIA = int(os.getenv('ASGI_COLETA_CONCORRENCIA', 16))
+
+    # Séries completas ingeridas dos CSVs de download (python -m src.services.ingestao_csv)
+    ARMAZEM_HABILITADO = os.getenv('ARMAZEM_HABILITADO', 'True').lower() == 'true'
+    ARMAZEM_DIRETORIO = os.getenv('ARMAZEM_DIRETORIO', os.path.join(CACHE_DIRETORIO, 'armazem'))
+    DADOS_CSV_DIRETORIO = os.getenv('DADOS_CSV_DIRETORIO', 'dados/csv')
+
+    # Agendador que pré-aquece e renova os dados antes de expirarem (um único worker líder)
+    AGENDADOR_HABILITADO = os.getenv('AGENDADOR_HABILITADO', 'True').lower() == 'true'
+    AGENDADOR_INTERVALO = float(os.getenv('AGENDADOR_INTERVALO', 900))
+    AGENDADOR_JITTER = float(os.getenv('AGENDADOR_JITTER', 0.1))
+    AGENDADOR_ATRASO_INICIAL = float(os.getenv('AGENDADOR_ATRASO_INICIAL', 10))
+    AGENDADOR_ANOS_RECENTES = int(os.getenv('AGENDADOR_ANOS_RECENTES', 2))
+    AGENDADOR_MAIS_REQUISITADAS = int(os.getenv('AGENDADOR_MAIS_REQUISITADAS', 20))
+    AGENDADOR_FRACAO_TTL = float(os.getenv('AGENDADOR_FRACAO_TTL', 0.8))
+    AGENDADOR_CONCORRENCIA = int(os.getenv('AGENDADOR_CONCORRENCIA', 2))
+    AGENDADOR_REQUISICOES_POR_SEGUNDO = float(os.getenv('AGENDADOR_REQUISICOES_POR_SEGUNDO', 1))
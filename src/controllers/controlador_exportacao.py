@@ -78,7 +78,7 @@ class ControladorExportacao:
                 "itens": itens
             }
             
-            return self.modelo.converterTiposNumpy(resultado)
+            return resultado
         except Exception as e:
             import traceback
             error_traceback = traceback.format_exc()
@@ -156,7 +156,7 @@ class ControladorExportacao:
                 "totalValor": total_valor
             }
             
-            return self.modelo.converterTiposNumpy(resultado)
+            return resultado
         except Exception as e:
             import traceback
             error_traceback = traceback.format_exc()
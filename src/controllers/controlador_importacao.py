@@ -31,7 +31,7 @@ class ControladorImportacao:
             "itens": itens
         }
         
-        return self.modelo.converterTiposNumpy(resultado)
+        return resultado
     
     def obterDadosHierarquicos(self, df_dados: pd.DataFrame) -> Dict[str, Any]:
         df_formatado = self.modelo.converterParaDataFrame(df_dados.to_dict('records'))
@@ -45,4 +45,4 @@ class ControladorImportacao:
             "totalGeral": total
         }
         
-        return self.modelo.converterTiposNumpy(resultado)
+        return resultado
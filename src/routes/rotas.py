@@ -1,5 +1,7 @@
-from flask import Blueprint, request, Response, jsonify
-import json
+from flask import Blueprint, request, Response, jsonify, stream_with_context
+import math
+import pandas as pd
+import time
 import traceback
 
 from src.services.servico_embrapa import ServicoEmbrapa
@@ -12,12 +14,92 @@ from src.controllers.controlador_processamento import ControladorProcessamento
 from src.controllers.controlador_comercializacao import ControladorComercializacao
 from src.controllers.controlador_importacao import ControladorImportacao
 from src.controllers.controlador_exportacao import ControladorExportacao
+from src.services.coleta_paralela import coletaParalela
+from src.services.agendador_atualizacao import agendadorAtualizacao
+from src.services.consulta_tabela import (
+    ColunasOpcao, ConsultaInvalidaError, ParametrosConsulta, aplicarConsulta, projetarColunas,
+    projetarItens
+)
+from src.services.motor_coleta import ESQUEMAS, ESTADO_FRESCO, motorColeta
+from src.services.agregados import agregadosTabela, registrosAgregados
 from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.utils.serializacao import serializarJson
+from src.utils.disjuntor import disjuntorEmbrapa
+from src.utils.prazo import ServicoIndisponivelError
+from src.utils.compressao import comprimirFluxo, escolherCodificacao
+from src.utils.fluxo_ndjson import MIME_TYPE_NDJSON, blocosNdjson, registrosResultado
+from src.utils.formatos_colunares import (
+    FORMATOS_COLUNARES, escolherFormatoColunar, formatosDisponiveis, serializarColunar, tabelaDados
+)
+from src.utils.validadores_http import (
+    aplicarValidadores, calcularEtag, naoModificado, respostaNaoModificada, sinalizarObsoleto
+)
+from src.utils.armazem_colunar import armazemColunar
+from src.utils.indice_nomes import indiceNomes
+from src.utils.normalizacao import normalizarNome
+from src.utils.cache import (
+    cacheDados, cachePersistente, cacheRespostas, coletaUnica, montarEntradaResposta,
+    normalizarChave, revalidacao
+)
 
 MIME_TYPE_JSON = 'application/json'
 
+OPCOES_VALIDAS = [
+    Configuracao.OPCAO_PRODUCAO,
+    Configuracao.OPCAO_PROCESSAMENTO,
+    Configuracao.OPCAO_COMERCIALIZACAO,
+    Configuracao.OPCAO_IMPORTACAO,
+    Configuracao.OPCAO_EXPORTACAO
+]
+
 api_blueprint = Blueprint('api', __name__)
 
+def calcular_max_age(chave, coletado_em):
+    if coletado_em is None:
+        return None
+    return int(cacheDados.ttlPara(chave) - (time.time() - coletado_em))
+
+def codificacao_disponivel(entrada):
+    codificacao = escolherCodificacao(request)
+    return codificacao if codificacao in entrada.variantes else None
+
+def montar_resposta_cacheada(entrada, mimetype=MIME_TYPE_JSON):
+    codificacao = codificacao_disponivel(entrada)
+    if codificacao:
+        resposta = Response(entrada.variantes[codificacao], mimetype=mimetype)
+        resposta.headers['Content-Encoding'] = codificacao
+    else:
+        resposta = Response(entrada.corpo, mimetype=mimetype)
+    resposta.headers.update(entrada.cabecalhos)
+    resposta.vary.add('Accept-Encoding')
+    return resposta
+
+def nomear_arquivo(resposta, formato_colunar, opcao, subopcao, anos):
+    extensao = FORMATOS_COLUNARES[formato_colunar][1]
+    partes = ['embrapa', opcao, subopcao, anos]
+    resposta.headers['Content-Disposition'] = (
+        f'attachment; filename="{"_".join(str(parte) for parte in partes if parte)}.{extensao}"'
+    )
+    return resposta
+
+def quer_ndjson(formato):
+    if formato == 'ndjson':
+        return True
+    melhor = request.accept_mimetypes.best_match([MIME_TYPE_JSON, MIME_TYPE_NDJSON])
+    return melhor == MIME_TYPE_NDJSON
+
+def montar_resposta_ndjson(blocos):
+    # Sem Content-Length: o corpo sai em chunks conforme é gerado, comprimido bloco a bloco
+    codificacao = escolherCodificacao(request)
+    if codificacao:
+        blocos = comprimirFluxo(blocos, codificacao)
+    resposta = Response(stream_with_context(blocos), mimetype=MIME_TYPE_NDJSON)
+    if codificacao:
+        resposta.headers['Content-Encoding'] = codificacao
+    resposta.vary.add('Accept-Encoding')
+    return resposta
+
 @api_blueprint.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -25,6 +107,205 @@ def health_check():
         "message": "API de dados da Embrapa está funcionando corretamente!"
     })
 
+@api_blueprint.route('/metricas', methods=['GET'])
+def obter_metricas():
+    return jsonify({
+        "cache": cacheDados.estatisticas(),
+        "cachePersistente": cachePersistente.estatisticas(),
+        "cacheRespostas": cacheRespostas.estatisticas(),
+        "coletaUnica": coletaUnica.estatisticas(),
+        "revalidacao": revalidacao.estatisticas(),
+        "disjuntor": disjuntorEmbrapa.estatisticas(),
+        "armazem": armazemColunar.estatisticas(),
+        "indiceNomes": indiceNomes.estatisticas(),
+        "agregados": agregadosTabela.estatisticas(),
+        "agendador": agendadorAtualizacao.estatisticas()
+    })
+
+def coletar_dados(opcao, ano, subopcao):
+    if opcao == Configuracao.OPCAO_PRODUCAO:
+        return ServicoEmbrapa().coletarDados(ano, opcao=opcao), ControladorProducao()
+    
+    if opcao == Configuracao.OPCAO_PROCESSAMENTO:
+        print(f"Coletando dados de processamento: ano={ano}, opcao={opcao}, subopcao={subopcao}")
+        df_dados = ServicoProcessamento().coletarDadosProcessamento(
+            ano, opcao=opcao, subopcao=subopcao
+        )
+        print(f"Dados coletados: {len(df_dados) if df_dados is not None else 'None'} registros")
+        return df_dados, ControladorProcessamento()
+    
+    if opcao == Configuracao.OPCAO_COMERCIALIZACAO:
+        servico = ServicoComercializacao()
+        return servico.coletarDadosComercializacao(ano, opcao=opcao, subopcao=subopcao), \
+            ControladorComercializacao()
+    
+    if opcao == Configuracao.OPCAO_IMPORTACAO:
+        return ServicoImportacao().coletarDadosImportacao(ano, opcao=opcao, subopcao=subopcao), \
+            ControladorImportacao()
+    
+    return ServicoExportacao().coletarDadosExportacao(ano, opcao=opcao, subopcao=subopcao), \
+        ControladorExportacao()
+
+def formatar_dados(controlador, df_dados, opcao, formato):
+    if opcao != Configuracao.OPCAO_PRODUCAO and formato == 'hierarquico':
+        return controlador.obterDadosHierarquicos(df_dados)
+    return controlador.formatarDados(df_dados)
+
+def formatar_consulta(controlador, df_dados, opcao, formato, consulta):
+    # Filtro, ordenação e paginação valem sobre o DataFrame; a projeção, sobre os itens já montados
+    if not consulta.ativa:
+        return formatar_dados(controlador, df_dados, opcao, formato)
+    df_consultado, paginacao = aplicarConsulta(df_dados, opcao, consulta)
+    resultado = formatar_dados(controlador, df_consultado, opcao, formato)
+    if 'itens' in resultado:
+        resultado['itens'] = projetarItens(resultado['itens'], consulta.campos)
+    if paginacao:
+        resultado['paginacao'] = paginacao
+    return resultado
+
+def tabela_consulta(df_dados, ano, opcao, consulta):
+    paginacao = None
+    if consulta.ativa:
+        df_dados, paginacao = aplicarConsulta(df_dados, opcao, consulta)
+    return projetarColunas(tabelaDados(df_dados, ano), opcao, consulta.campos), paginacao
+
+def cabecalhos_paginacao(paginacao):
+    if not paginacao:
+        return {}
+    cabecalhos = {'X-Total-Registros': str(paginacao['total'])}
+    if paginacao['proximoCursor']:
+        cabecalhos['X-Proximo-Cursor'] = paginacao['proximoCursor']
+    return cabecalhos
+
+def variantes_consulta(consulta):
+    # Consultas sem filtro mantêm as mesmas chaves de cache e ETags de antes
+    return (consulta,) if consulta.ativa else ()
+
+def resposta_indisponivel(erro, ano, opcao, subopcao):
+    resposta = jsonify({
+        "erro": f"Site da Embrapa indisponível no momento: {str(erro)}",
+        "ano": ano,
+        "opcao": opcao,
+        "subopcao": subopcao
+    })
+    resposta.status_code = 503
+    if erro.tentarEm is not None:
+        resposta.headers['Retry-After'] = str(max(1, int(math.ceil(erro.tentarEm))))
+    return resposta
+
+def obter_subopcao_padrao(opcao):
+    if opcao == Configuracao.OPCAO_PROCESSAMENTO:
+        return Configuracao.SUBOPCAO_PROCESSAMENTO_PADRAO
+    if opcao == Configuracao.OPCAO_IMPORTACAO:
+        return Configuracao.SUBOPCAO_IMPORTACAO_PADRAO
+    if opcao == Configuracao.OPCAO_EXPORTACAO:
+        return Configuracao.SUBOPCAO_EXPORTACAO_PADRAO
+    return None
+
+def validar_subopcao(opcao, subopcao):
+    # A subopção vira parâmetro da URL da Embrapa e caminho no armazém: só as conhecidas passam
+    subopcoes = ESQUEMAS[opcao].subopcoes
+    if subopcao and subopcao.strip().lower() not in subopcoes:
+        return jsonify({
+            "erro": f"Subopção '{subopcao}' não reconhecida para a opção {opcao}",
+            "subopcoes_validas": list(subopcoes)
+        }), 400
+    return None
+
+def validar_intervalo(ano_inicio, ano_fim):
+    if ano_inicio > ano_fim:
+        return jsonify({"erro": "'ano_inicio' deve ser menor ou igual a 'ano_fim'"}), 400
+    if ano_fim - ano_inicio + 1 > Configuracao.INTERVALO_ANOS_MAXIMO:
+        return jsonify({
+            "erro": f"O intervalo pode ter no máximo {Configuracao.INTERVALO_ANOS_MAXIMO} anos"
+        }), 400
+    return None
+
+def etag_intervalo(versoes, *variantes):
+    # Só há ETag se todos os anos vieram e têm versão
+    if not versoes or not all(versoes.values()):
+        return None
+    versao = calcularEtag(','.join(f"{ano}:{versoes[ano]}" for ano in sorted(versoes)))
+    return calcularEtag(versao, *variantes)
+
+def carregar_anos_armazenados(opcao, subopcao, anos):
+    # Anos já no armazém saem numa única leitura do dataset; os demais seguem a coleta ano a ano
+    _, opcao_chave, subopcao_chave = normalizarChave(
+        None, opcao, subopcao or ESQUEMAS[opcao].subopcaoPadrao
+    )
+    armazemColunar.carregarAnos(opcao_chave, subopcao_chave, anos)
+
+def obter_intervalo_anos(ano_inicio, ano_fim, opcao, subopcao, formato, indentado, ndjson=False,
+                         formato_colunar=None, consulta=ParametrosConsulta()):
+    erro = validar_intervalo(ano_inicio, ano_fim)
+    if erro:
+        return erro
+    anos = range(ano_inicio, ano_fim + 1)
+    carregar_anos_armazenados(opcao, subopcao, anos)
+    
+    versoes = {}
+    
+    def coletar_ano(ano):
+        df_dados, controlador = coletar_dados(opcao, ano, subopcao)
+        versoes[ano] = df_dados.attrs.get('versao')
+        resultado = formatar_consulta(controlador, df_dados, opcao, formato, consulta)
+        if 'erro' in resultado:
+            raise ValueError(resultado['erro'])
+        return resultado
+    
+    if ndjson:
+        # Cada ano é enviado assim que fica pronto, sem montar o intervalo inteiro em memória
+        def blocos():
+            for ano, resultado, erro in coletaParalela.iterarPorAno(coletar_ano, anos):
+                if erro is None:
+                    registros = registrosResultado(resultado, ano=ano)
+                else:
+                    registros = [{"ano": ano, "erro": erro}]
+                yield from blocosNdjson(registros)
+        return montar_resposta_ndjson(blocos())
+    
+    if formato_colunar:
+        # Uma única tabela com a coluna `ano`, concatenada direto dos DataFrames coletados
+        def coletar_tabela(ano):
+            df_dados, _ = coletar_dados(opcao, ano, subopcao)
+            versoes[ano] = df_dados.attrs.get('versao')
+            return tabela_consulta(df_dados, ano, opcao, consulta)[0]
+        
+        tabelas, falhas = coletaParalela.executarPorAno(coletar_tabela, anos)
+        if not tabelas:
+            return jsonify({
+                "erro": "Nenhum ano do intervalo pôde ser coletado",
+                "falhas": {str(ano): erro for ano, erro in falhas.items()}
+            }), 502
+        resposta = Response(
+            serializarColunar(pd.concat(tabelas.values(), ignore_index=True), formato_colunar),
+            mimetype=FORMATOS_COLUNARES[formato_colunar][0]
+        )
+        nomear_arquivo(resposta, formato_colunar, opcao, subopcao, f"{ano_inicio}-{ano_fim}")
+        if falhas:
+            resposta.headers['X-Anos-Com-Falha'] = ','.join(str(ano) for ano in falhas)
+    else:
+        resultados, falhas = coletaParalela.executarPorAno(coletar_ano, anos)
+        
+        resposta = Response(serializarJson({
+            "ano_inicio": ano_inicio,
+            "ano_fim": ano_fim,
+            "opcao": opcao,
+            "subopcao": subopcao,
+            "anos": {str(ano): resultado for ano, resultado in resultados.items()},
+            "falhas": {str(ano): erro for ano, erro in falhas.items()}
+        }, indentado=indentado), status=200 if resultados else 502, mimetype=MIME_TYPE_JSON)
+    
+    etag = None if falhas else etag_intervalo(
+        versoes, formato, indentado, *variantes_consulta(consulta)
+    )
+    if etag:
+        if naoModificado(request, etag, None):
+            return respostaNaoModificada(etag, None, None, escolherCodificacao(request))
+        aplicarValidadores(resposta, etag, None, None)
+    
+    return resposta
+
 @api_blueprint.route('/embrapa_data', methods=['GET'])
 def obter_dados_embrapa():
     data = request.args.get('data', type=int)
@@ -39,68 +320,111 @@ def obter_dados_embrapa():
     
     opcao = request.args.get('opcao', default=Configuracao.OPCAO_PRODUCAO, type=str)
     formato = request.args.get('formato', default='padrao', type=str).lower()
+    indentado = request.args.get('pretty', default='0', type=str).lower() in ('1', 'true', 'sim')
+    # Arrow/Parquet/CSV saem direto do DataFrame coletado, sem passar pelo formatarDados
+    formato_colunar = None if formato == 'ndjson' else escolherFormatoColunar(
+        formato, request, (MIME_TYPE_JSON, MIME_TYPE_NDJSON)
+    )
+    if formato_colunar is not None and formato_colunar not in formatosDisponiveis():
+        return jsonify({
+            "erro": f"Formato '{formato_colunar}' indisponível neste servidor",
+            "formatos_disponiveis": list(formatosDisponiveis())
+        }), 406
+    ndjson = formato_colunar is None and quer_ndjson(formato)
+    if ndjson:
+        # NDJSON: um item do formato padrão por linha
+        formato, indentado = 'ndjson', False
+    elif formato_colunar:
+        formato, indentado = formato_colunar, False
     
-    subopcao_padrao = None
-    if opcao == Configuracao.OPCAO_PROCESSAMENTO:
-        subopcao_padrao = Configuracao.SUBOPCAO_PROCESSAMENTO_PADRAO
-    elif opcao == Configuracao.OPCAO_IMPORTACAO:
-        subopcao_padrao = Configuracao.SUBOPCAO_IMPORTACAO_PADRAO    
-    elif opcao == Configuracao.OPCAO_EXPORTACAO:
-        subopcao_padrao = Configuracao.SUBOPCAO_EXPORTACAO_PADRAO
+    subopcao = request.args.get('subopcao', default=obter_subopcao_padrao(opcao), type=str)
     
-    subopcao = request.args.get('subopcao', default=subopcao_padrao, type=str)
+    if opcao not in OPCOES_VALIDAS:
+        return jsonify({
+            "erro": f"Opção '{opcao}' não reconhecida",
+            "opcoes_validas": OPCOES_VALIDAS
+        }), 400
+    erro = validar_subopcao(opcao, subopcao)
+    if erro:
+        return erro
+    
+    try:
+        consulta = ParametrosConsulta.deArgumentos(request.args)
+        consulta.validarOpcao(opcao)
+    except ConsultaInvalidaError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    ano_inicio = request.args.get('ano_inicio', type=int)
+    ano_fim = request.args.get('ano_fim', type=int)
+    if ano_inicio is not None or ano_fim is not None:
+        return obter_intervalo_anos(
+            ano_inicio if ano_inicio is not None else ano_fim,
+            ano_fim if ano_fim is not None else ano_inicio,
+            opcao, subopcao, formato, indentado, ndjson, formato_colunar, consulta
+        )
     
     try:
         df_dados = None
-        resultado = None
-        if opcao == Configuracao.OPCAO_PRODUCAO:
-            servico = ServicoEmbrapa()
-            controlador = ControladorProducao()
-            df_dados = servico.coletarDados(ano, opcao=opcao)
-            resultado = controlador.formatarDados(df_dados)
-            
-        elif opcao == Configuracao.OPCAO_PROCESSAMENTO:
-            servico = ServicoProcessamento()
-            controlador = ControladorProcessamento()
-            print(f"Coletando dados de processamento: ano={ano}, opcao={opcao}, subopcao={subopcao}")
-            df_dados = servico.coletarDadosProcessamento(ano, opcao=opcao, subopcao=subopcao)
-            print(f"Dados coletados: {len(df_dados) if df_dados is not None else 'None'} registros")
-            
-        elif opcao == Configuracao.OPCAO_COMERCIALIZACAO:
-            servico = ServicoComercializacao()
-            controlador = ControladorComercializacao()
-            df_dados = servico.coletarDadosComercializacao(ano, opcao=opcao, subopcao=subopcao)
-            
-        elif opcao == Configuracao.OPCAO_IMPORTACAO:
-            servico = ServicoImportacao()
-            controlador = ControladorImportacao()
-            df_dados = servico.coletarDadosImportacao(ano, opcao=opcao, subopcao=subopcao)
-            
-        elif opcao == Configuracao.OPCAO_EXPORTACAO:
-            servico = ServicoExportacao()
-            controlador = ControladorExportacao()
-            df_dados = servico.coletarDadosExportacao(ano, opcao=opcao, subopcao=subopcao)
-            
-        else:
-            return jsonify({
-                "erro": f"Opção '{opcao}' não reconhecida",
-                "opcoes_validas": [
-                    Configuracao.OPCAO_PRODUCAO,
-                    Configuracao.OPCAO_PROCESSAMENTO,
-                    Configuracao.OPCAO_COMERCIALIZACAO, 
-                    Configuracao.OPCAO_IMPORTACAO,
-                    Configuracao.OPCAO_EXPORTACAO
-                ]            }), 400
+        df_dados, controlador = coletar_dados(opcao, ano_final, subopcao)
+        
+        # A versão muda quando a tabela coletada muda, invalidando a resposta em cache
+        versao = df_dados.attrs.get('versao')
+        coletado_em = df_dados.attrs.get('coletadoEm')
+        chave_dados = normalizarChave(ano_final, opcao, subopcao)
+        chave_resposta = (*chave_dados, formato, indentado, *variantes_consulta(consulta))
+        etag = calcularEtag(versao, formato, indentado, *variantes_consulta(consulta))
+        max_age = calcular_max_age(chave_dados, coletado_em)
+        
+        entrada = cacheRespostas.obter(chave_resposta) if versao else None
+        if entrada is not None and entrada.versao != versao:
+            entrada = None
         
-        if opcao != Configuracao.OPCAO_PRODUCAO and df_dados is not None:
-            if formato.lower() == 'hierarquico':
-                resultado = controlador.obterDadosHierarquicos(df_dados)
-            else:
-                resultado = controlador.formatarDados(df_dados)
+        if naoModificado(request, etag, coletado_em):
+            codificacao = (
+                codificacao_disponivel(entrada) if entrada else escolherCodificacao(request)
+            )
+            resposta = respostaNaoModificada(etag, coletado_em, max_age, codificacao)
+        elif ndjson:
+            resultado = formatar_consulta(controlador, df_dados, opcao, formato, consulta)
+            resposta = montar_resposta_ndjson(
+                blocosNdjson(registrosResultado(resultado, ano=ano_final))
+            )
+            resposta = aplicarValidadores(resposta, etag, coletado_em, max_age)
+        elif formato_colunar:
+            if entrada is None:
+                tabela, paginacao = tabela_consulta(df_dados, ano_final, opcao, consulta)
+                # Parquet já sai comprimido (zstd); br/gzip por cima só gastaria CPU
+                entrada = montarEntradaResposta(
+                    versao, serializarColunar(tabela, formato_colunar),
+                    comprimir=formato_colunar != 'parquet',
+                    cabecalhos=cabecalhos_paginacao(paginacao)
+                )
+                if versao:
+                    cacheRespostas.gravar(chave_resposta, entrada)
+            resposta = montar_resposta_cacheada(entrada, FORMATOS_COLUNARES[formato_colunar][0])
+            nomear_arquivo(resposta, formato_colunar, opcao, subopcao, ano_final)
+            resposta = aplicarValidadores(resposta, etag, coletado_em, max_age)
+        else:
+            if entrada is None:
+                resultado = formatar_consulta(controlador, df_dados, opcao, formato, consulta)
+                entrada = montarEntradaResposta(
+                    versao, serializarJson(resultado, indentado=indentado)
+                )
+                if versao and 'erro' not in resultado:
+                    cacheRespostas.gravar(chave_resposta, entrada)
+            resposta = aplicarValidadores(
+                montar_resposta_cacheada(entrada), etag, coletado_em, max_age
+            )
         
-        json_output = json.dumps(resultado, indent=4, ensure_ascii=False)
-        return Response(json_output, mimetype=MIME_TYPE_JSON)
+        # Cópia vencida servida enquanto revalida ou durante indisponibilidade do site
+        if df_dados.attrs.get('obsoleto'):
+            sinalizarObsoleto(resposta, coletado_em)
+        return resposta
         
+    except ServicoIndisponivelError as e:
+        # Disjuntor aberto ou prazo esgotado, sem cópia anterior para servir: falha rápida
+        return resposta_indisponivel(e, ano_final, opcao, subopcao)
+    
     except Exception as e:
         error_traceback = traceback.format_exc()
         print(f"ERRO: {str(e)}")
@@ -122,3 +446,153 @@ def obter_dados_embrapa():
             "df_info": df_info,
             "detalhes": error_traceback
         }), 500
+
+def pontos_serie(df_dados, ano, posicoes, colunas):
+    pontos = []
+    for posicao in posicoes:
+        linha = df_dados.iloc[posicao]
+        ponto = {
+            "ano": ano, "produto": linha[colunas.nome],
+            "quantidade": int(linha[colunas.quantidade])
+        }
+        if colunas.valor is not None:
+            ponto["valor"] = float(linha[colunas.valor])
+        if colunas.categoriaPai is not None:
+            # Nomes como "Tintas" se repetem sob categorias diferentes
+            ponto["categoria"] = None if bool(linha[colunas.ehPai]) else linha[colunas.categoriaPai]
+        pontos.append(ponto)
+    return pontos
+
+@api_blueprint.route('/serie', methods=['GET'])
+def obter_serie():
+    nome = request.args.get('nome', default='', type=str).strip()
+    opcao = request.args.get('opcao', default=Configuracao.OPCAO_PRODUCAO, type=str)
+    if not nome:
+        return jsonify({"erro": "Informe o produto ou país em 'nome'"}), 400
+    if opcao not in OPCOES_VALIDAS:
+        return jsonify({
+            "erro": f"Opção '{opcao}' não reconhecida",
+            "opcoes_validas": OPCOES_VALIDAS
+        }), 400
+    subopcao = request.args.get('subopcao', default=obter_subopcao_padrao(opcao), type=str)
+    ano_inicio = request.args.get('ano_inicio', default=Configuracao.SERIE_ANO_INICIAL, type=int)
+    ano_fim = request.args.get('ano_fim', default=Configuracao.ANO_PADRAO, type=int)
+    erro = validar_subopcao(opcao, subopcao) or validar_intervalo(ano_inicio, ano_fim)
+    if erro:
+        return erro
+    
+    colunas = ColunasOpcao.doEsquema(ESQUEMAS[opcao])
+    carregar_anos_armazenados(opcao, subopcao, range(ano_inicio, ano_fim + 1))
+    versoes = {}
+    
+    def coletar_ano(ano):
+        chave = normalizarChave(ano, opcao, subopcao)
+        # Ano fresco e já indexado na coleta: o índice diz se o nome está nele sem abrir a tabela
+        if motorColeta.estadoLocal(chave) == ESTADO_FRESCO and indiceNomes.indexado(chave):
+            versoes[ano] = indiceNomes.versao(chave)
+            if not indiceNomes.localizar(nome, chave):
+                return []
+        df_dados, _ = coletar_dados(opcao, ano, subopcao)
+        versoes[ano] = df_dados.attrs.get('versao')
+        # A coleta já indexou a versão servida; aqui só reindexa se outra a trocou no meio tempo
+        indiceNomes.indexar(chave, df_dados, colunas.nome)
+        return pontos_serie(df_dados, ano, indiceNomes.localizar(nome, chave), colunas)
+    
+    resultados, falhas = coletaParalela.executarPorAno(coletar_ano, range(ano_inicio, ano_fim + 1))
+    serie = [ponto for pontos in resultados.values() for ponto in pontos]
+    
+    if not serie and not falhas:
+        tabelas = indiceNomes.tabelas(nome)
+        return jsonify({
+            "erro": f"'{nome}' não encontrado em {opcao}" + (f"/{subopcao}" if subopcao else ""),
+            "encontrado_em": [
+                {"opcao": outra_opcao, "subopcao": outra_subopcao, "anos": anos}
+                for (outra_opcao, outra_subopcao), anos in tabelas.items()
+            ]
+        }), 404
+    
+    resposta = Response(serializarJson({
+        "nome": nome,
+        "opcao": opcao,
+        "subopcao": subopcao,
+        "ano_inicio": ano_inicio,
+        "ano_fim": ano_fim,
+        "serie": serie,
+        "falhas": {str(ano): erro for ano, erro in falhas.items()}
+    }), status=200 if resultados else 502, mimetype=MIME_TYPE_JSON)
+    
+    etag = None if falhas else etag_intervalo(versoes, 'serie', normalizarNome(nome))
+    if etag:
+        if naoModificado(request, etag, None):
+            return respostaNaoModificada(etag, None, None, escolherCodificacao(request))
+        aplicarValidadores(resposta, etag, None, None)
+    
+    return resposta
+
+def coletar_ano_anterior(opcao, ano, subopcao):
+    # Sem o ano anterior os agregados saem só sem a variação anual
+    if ano - 1 < Configuracao.SERIE_ANO_INICIAL:
+        return None
+    try:
+        df_anterior, _ = coletar_dados(opcao, ano - 1, subopcao)
+        return df_anterior
+    except Exception as e:
+        logger.warning(f"Ano anterior ({ano - 1}) indisponível para os agregados: {e}")
+        return None
+
+@api_blueprint.route('/agregados', methods=['GET'])
+def obter_agregados():
+    ano = request.args.get('ano', default=Configuracao.ANO_PADRAO, type=int)
+    opcao = request.args.get('opcao', default=Configuracao.OPCAO_PRODUCAO, type=str)
+    top = request.args.get('top', type=int)
+    if opcao not in OPCOES_VALIDAS:
+        return jsonify({
+            "erro": f"Opção '{opcao}' não reconhecida",
+            "opcoes_validas": OPCOES_VALIDAS
+        }), 400
+    if top is not None and top < 1:
+        return jsonify({"erro": "'top' deve ser um inteiro positivo"}), 400
+    subopcao = request.args.get('subopcao', default=obter_subopcao_padrao(opcao), type=str)
+    erro = validar_subopcao(opcao, subopcao)
+    if erro:
+        return erro
+    
+    carregar_anos_armazenados(opcao, subopcao, (ano - 1, ano))
+    try:
+        df_dados, _ = coletar_dados(opcao, ano, subopcao)
+        df_anterior = coletar_ano_anterior(opcao, ano, subopcao)
+        chave = normalizarChave(ano, opcao, subopcao or ESQUEMAS[opcao].subopcaoPadrao)
+        agregados = agregadosTabela.obter(chave, df_dados, df_anterior)
+        etag = calcularEtag(agregados.attrs.get('versaoOrigem'), 'agregados', top)
+        if etag and naoModificado(request, etag, None):
+            return respostaNaoModificada(etag, None, None, escolherCodificacao(request))
+        
+        total, itens = registrosAgregados(agregados, top)
+        resposta = Response(serializarJson({
+            "ano": ano,
+            "opcao": opcao,
+            "subopcao": subopcao,
+            "ano_anterior": ano - 1 if df_anterior is not None else None,
+            "total": total,
+            "itens": itens
+        }), mimetype=MIME_TYPE_JSON)
+        if etag:
+            aplicarValidadores(resposta, etag, None, None)
+        if df_dados.attrs.get('obsoleto'):
+            sinalizarObsoleto(resposta, df_dados.attrs.get('coletadoEm'))
+        return resposta
+    
+    except ServicoIndisponivelError as e:
+        return resposta_indisponivel(e, ano, opcao, subopcao)
+    
+    except Exception as e:
+        logger.exception(
+            f"Falha ao calcular os agregados de {opcao}/{subopcao or '-'} em {ano}: {e}"
+        )
+        return jsonify({
+            "erro": f"Erro ao processar dados: {str(e)}",
+            "ano": ano,
+            "opcao": opcao,
+            "subopcao": subopcao,
+            "detalhes": traceback.format_exc()
+        }), 500
@@ -0,0 +1,191 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+
+import httpx
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.services.coletor_assincrono import ColetorAssincrono, TarefaColeta
+from src.services.motor_coleta import ESQUEMAS, ESTADO_FRESCO, ESTADO_OBSOLETO, motorColeta
+from src.utils.cache import ChaveColeta, normalizarChave, revalidacao
+from src.utils.ponte_wsgi import PonteWsgi
+from src.utils.prazo import esgotarPrazo
+
+
+def chavesDaRequisicao(parametros: Dict[str, List[str]]) -> List[ChaveColeta]:
+    """Chaves (ano, opcao, subopcao) que /embrapa_data vai consultar, com os padrões da rota."""
+    def valor(nome: str, padrao: Optional[str] = None) -> Optional[str]:
+        return parametros[nome][0] if nome in parametros else padrao
+
+    def inteiro(nome: str) -> Optional[int]:
+        try:
+            return int(valor(nome))
+        except (TypeError, ValueError):
+            return None
+
+    opcao = valor('opcao', Configuracao.OPCAO_PRODUCAO)
+    if opcao not in ESQUEMAS:
+        return []
+    # Subopção desconhecida: nada a aquecer, a rota responde 400
+    subopcao = valor('subopcao') or ESQUEMAS[opcao].subopcaoPadrao
+    if subopcao and subopcao.strip().lower() not in ESQUEMAS[opcao].subopcoes:
+        return []
+
+    inicio, fim = inteiro('ano_inicio'), inteiro('ano_fim')
+    if inicio is not None or fim is not None:
+        inicio, fim = (inicio if inicio is not None else fim), (fim if fim is not None else inicio)
+        if inicio > fim or fim - inicio + 1 > Configuracao.INTERVALO_ANOS_MAXIMO:
+            return []
+        anos = list(range(inicio, fim + 1))
+    else:
+        data, ano = inteiro('data'), inteiro('ano')
+        anos = [data if data is not None else ano if ano is not None else Configuracao.ANO_PADRAO]
+    return [normalizarChave(ano, opcao, subopcao) for ano in anos]
+
+
+class AquecedorAssincrono:
+    """Garante, sem bloquear threads, que os dados da requisição estejam locais antes de renderizar.
+
+    Chaves ausentes são coletadas com httpx no event loop (uma coleta por chave,
+    compartilhada entre requisições simultâneas); chaves obsoletas dentro da
+    janela de revalidação são servidas na hora e renovadas numa tarefa à parte.
+    """
+
+    def __init__(self, maximoSimultaneas: int):
+        self.coletor = ColetorAssincrono(
+            maximoSimultaneas=maximoSimultaneas, requisicoesPorSegundo=0
+        )
+        self._cliente: Optional[httpx.AsyncClient] = None
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._emAndamento: Dict[ChaveColeta, asyncio.Task] = {}
+        self.coletas = 0
+        self.revalidacoes = 0
+
+    def _preparar(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._cliente = self.coletor.criarCliente()
+            self._semaforo = asyncio.Semaphore(self.coletor.maximoSimultaneas)
+            self._emAndamento = {}
+
+    def _coletar(self, chave: ChaveColeta) -> asyncio.Task:
+        tarefa = self._emAndamento.get(chave)
+        if tarefa is None:
+            self.coletas += 1
+            tarefa = asyncio.ensure_future(
+                self.coletor.coletar(self._cliente, self._semaforo, TarefaColeta(*chave))
+            )
+            self._emAndamento[chave] = tarefa
+            tarefa.add_done_callback(lambda concluida: self._concluir(chave, concluida))
+        return tarefa
+
+    def _concluir(self, chave: ChaveColeta, tarefa: asyncio.Task) -> None:
+        self._emAndamento.pop(chave, None)
+        if not tarefa.cancelled() and tarefa.exception() is not None:
+            logger.warning(f"Coleta assíncrona de {chave} falhou: {tarefa.exception()}")
+
+    async def _revalidar(self, chave: ChaveColeta) -> None:
+        try:
+            await self._coletar(chave)
+        except Exception as e:
+            revalidacao.liberar(chave, e)
+        else:
+            revalidacao.liberar(chave)
+
+    async def aquecer(self, chaves: List[ChaveColeta], prazo: float) -> None:
+        self._preparar()
+        pendentes = []
+        for chave in chaves:
+            estado = motorColeta.estadoLocal(chave)
+            if estado == ESTADO_FRESCO:
+                continue
+            if estado == ESTADO_OBSOLETO:
+                if revalidacao.reservar(chave):
+                    self.revalidacoes += 1
+                    asyncio.ensure_future(self._revalidar(chave))
+                continue
+            pendentes.append(self._coletar(chave))
+        if pendentes:
+            # Estourado o prazo, a coleta segue em andamento para as próximas requisições
+            await asyncio.wait(set(pendentes), timeout=prazo)
+
+    async def encerrar(self) -> None:
+        if self._cliente is not None:
+            await self._cliente.aclose()
+            self._cliente = None
+            self._loop = None
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "emAndamento": len(self._emAndamento),
+            "coletas": self.coletas,
+            "revalidacoes": self.revalidacoes
+        }
+
+
+class AppAssincrono:
+    """App ASGI com as mesmas rotas e o mesmo JSON do app Flask.
+
+    /health responde direto no event loop. Em /embrapa_data a ida ao site da
+    Embrapa é feita de forma assíncrona pelo `AquecedorAssincrono`; em seguida a
+    rota Flask renderiza a resposta a partir dos dados locais, sem voltar ao
+    site, numa thread da `PonteWsgi`. As demais rotas passam direto pela ponte.
+    """
+
+    def __init__(self, appWsgi: Callable):
+        self.appWsgi = appWsgi
+        self.ponte = PonteWsgi(appWsgi, Configuracao.ASGI_THREADS)
+        self.aquecedor = AquecedorAssincrono(Configuracao.ASGI_COLETA_CONCORRENCIA)
+        self._saude: Optional[Dict[str, Any]] = None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            await self.cicloDeVida(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if scope['path'] == Configuracao.API_HEALTH_URL and scope['method'] in ('GET', 'HEAD'):
+            await self.saude(scope, send)
+            return
+
+        if scope['path'] == '/embrapa_data' and scope['method'] == 'GET':
+            consulta = scope.get('query_string', b'').decode('latin-1')
+            parametros = parse_qs(consulta, keep_blank_values=True)
+            await self.aquecedor.aquecer(
+                chavesDaRequisicao(parametros), Configuracao.HTTP_PRAZO_REQUISICAO
+            )
+            # O que podia ser coletado já foi; a renderização síncrona não volta ao site
+            esgotarPrazo()
+
+        await self.ponte(scope, receive, send)
+
+    async def saude(self, scope: Dict[str, Any], send: Callable) -> None:
+        if self._saude is None:
+            # Corpo e cabeçalhos gerados uma vez pela própria rota Flask: mesmo contrato JSON
+            resposta = await asyncio.to_thread(
+                lambda: self.appWsgi.test_client().get(Configuracao.API_HEALTH_URL)
+            )
+            self._saude = {
+                'status': resposta.status_code,
+                'headers': [(nome.lower().encode('latin-1'), valor.encode('latin-1'))
+                            for nome, valor in resposta.headers.items()],
+                'body': resposta.get_data()
+            }
+        await send({'type': 'http.response.start', 'status': self._saude['status'],
+                    'headers': self._saude['headers']})
+        await send({'type': 'http.response.body',
+                    'body': b'' if scope['method'] == 'HEAD' else self._saude['body']})
+
+    async def cicloDeVida(self, receive: Callable, send: Callable) -> None:
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensagem['type'] == 'lifespan.shutdown':
+                await self.aquecedor.encerrar()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
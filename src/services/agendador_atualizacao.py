@@ -0,0 +1,201 @@
+"""Pré-aquecimento e renovação dos dados antes de expirarem.
+
+Roda como thread em cada worker (iniciada pelo app.py) ou como processo à parte:
+    python -m src.services.agendador_atualizacao [--uma-vez]
+
+Uma trava de arquivo elege um único líder entre os workers do gunicorn; só ele
+vai ao site da Embrapa. Os demais apenas publicam seus contadores de acesso e
+assumem a liderança se o líder morrer.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.services.coletor_assincrono import ColetorAssincrono, TarefaColeta
+from src.services.motor_coleta import ESQUEMAS
+from src.utils.armazem_colunar import ORIGEM_CSV, armazemColunar
+from src.utils.cache import ChaveColeta, cacheDados, cachePersistente, normalizarChave
+from src.utils.registro_acessos import registroAcessos
+
+try:
+    import fcntl
+except ImportError:  # Windows: cada processo se considera líder
+    fcntl = None
+
+
+class AgendadorAtualizacao:
+    def __init__(self, intervalo: float, jitter: float, anosRecentes: int, maisRequisitadas: int,
+                 fracaoTtl: float, caminhoTrava: str):
+        self.intervalo = intervalo
+        self.jitter = jitter
+        self.anosRecentes = anosRecentes
+        self.maisRequisitadas = maisRequisitadas
+        self.fracaoTtl = fracaoTtl
+        self.caminhoTrava = caminhoTrava
+        self._arquivoTrava = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._parar = threading.Event()
+        self.lider = False
+        self.ciclos = 0
+        self.atualizadas = 0
+        self.falhas = 0
+        self.ultimoCiclo: Optional[float] = None
+
+    def chavesCandidatas(self) -> List[ChaveColeta]:
+        """Anos mais recentes de todas as abas, seguidos das chaves mais requisitadas."""
+        chaves = [
+            normalizarChave(Configuracao.ANO_PADRAO - deslocamento, opcao, subopcao)
+            for deslocamento in range(self.anosRecentes)
+            for opcao, esquema in ESQUEMAS.items()
+            for subopcao in (esquema.subopcoes or (None,))
+        ]
+        chaves += registroAcessos.maisRequisitadas(self.maisRequisitadas)
+        return list(dict.fromkeys(chaves))
+
+    def coletadoEm(self, chave: ChaveColeta) -> Optional[float]:
+        metadados = armazemColunar.metadados(chave)
+        if metadados is not None:
+            origem, coletadoEm = metadados
+            # Partições da ingestão de CSV não expiram
+            return float('inf') if origem == ORIGEM_CSV else coletadoEm
+        entrada = cachePersistente.obter(chave)
+        return entrada[1] if entrada is not None else None
+
+    def precisaAtualizar(self, chave: ChaveColeta) -> bool:
+        # Renova antes da expiração, para que as requisições nunca encontrem o dado frio
+        coletadoEm = self.coletadoEm(chave)
+        if coletadoEm is None:
+            return True
+        return time.time() - coletadoEm >= cacheDados.ttlPara(chave) * self.fracaoTtl
+
+    def tornarLider(self) -> bool:
+        if self.lider:
+            return True
+        if fcntl is None:
+            self.lider = True
+            return True
+        try:
+            os.makedirs(os.path.dirname(self.caminhoTrava) or '.', exist_ok=True)
+            if self._arquivoTrava is None:
+                self._arquivoTrava = open(self.caminhoTrava, 'a')
+            # Mantida aberta enquanto o processo viver; o SO a libera se o líder morrer
+            fcntl.flock(self._arquivoTrava, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.lider = True
+            logger.info(f"Agendador de atualização: worker {os.getpid()} assumiu a liderança")
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            logger.warning(f"Agendador de atualização: falha na trava de liderança: {e}")
+        return self.lider
+
+    def executarCiclo(self) -> Dict[str, Any]:
+        registroAcessos.persistir()
+        if not self.tornarLider():
+            return {"lider": False}
+
+        pendentes = [chave for chave in self.chavesCandidatas() if self.precisaAtualizar(chave)]
+        falhas = 0
+        if pendentes:
+            coletor = ColetorAssincrono(
+                maximoSimultaneas=Configuracao.AGENDADOR_CONCORRENCIA,
+                requisicoesPorSegundo=Configuracao.AGENDADOR_REQUISICOES_POR_SEGUNDO
+            )
+            tarefas = [TarefaColeta(*chave) for chave in pendentes]
+            resultados = asyncio.run(coletor.coletarTarefas(tarefas))
+            for chave, resultado in resultados.items():
+                if isinstance(resultado, Exception):
+                    falhas += 1
+                    logger.warning(
+                        f"Agendador de atualização: falha ao renovar {chave}: {resultado}"
+                    )
+
+        self.ciclos += 1
+        self.atualizadas += len(pendentes) - falhas
+        self.falhas += falhas
+        self.ultimoCiclo = time.time()
+        logger.info(
+            f"Agendador de atualização: {len(pendentes) - falhas}/{len(pendentes)} chaves renovadas"
+        )
+        return {"lider": True, "pendentes": len(pendentes), "falhas": falhas}
+
+    def proximaEspera(self) -> float:
+        # Jitter para que workers e réplicas não sincronizem as idas ao site
+        return self.intervalo * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def executarEmLaco(self, atrasoInicial: float) -> None:
+        espera = random.uniform(0, atrasoInicial)
+        while not self._parar.wait(espera):
+            try:
+                self.executarCiclo()
+            except Exception as e:
+                logger.error(f"Agendador de atualização: erro no ciclo: {e}")
+            espera = self.proximaEspera()
+
+    def iniciar(self, atrasoInicial: Optional[float] = None) -> bool:
+        """Inicia a thread do agendador neste processo (uma vez por pid)."""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return False
+        self._pid = os.getpid()
+        self._parar.clear()
+        if atrasoInicial is None:
+            atrasoInicial = Configuracao.AGENDADOR_ATRASO_INICIAL
+        self._thread = threading.Thread(
+            target=self.executarEmLaco,
+            args=(atrasoInicial,),
+            name='agendador-atualizacao',
+            daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def parar(self) -> None:
+        self._parar.set()
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "ativo": self._thread is not None and self._thread.is_alive(),
+            "lider": self.lider,
+            "ciclos": self.ciclos,
+            "atualizadas": self.atualizadas,
+            "falhas": self.falhas,
+            "ultimoCiclo": self.ultimoCiclo
+        }
+
+
+agendadorAtualizacao = AgendadorAtualizacao(
+    Configuracao.AGENDADOR_INTERVALO,
+    Configuracao.AGENDADOR_JITTER,
+    Configuracao.AGENDADOR_ANOS_RECENTES,
+    Configuracao.AGENDADOR_MAIS_REQUISITADAS,
+    Configuracao.AGENDADOR_FRACAO_TTL,
+    os.path.join(Configuracao.CACHE_DIRETORIO, 'agendador.lock')
+)
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Pré-aquece e renova os dados do vitibrasil em segundo plano.'
+    )
+    parser.add_argument('--uma-vez', action='store_true', help='Executa um único ciclo e termina')
+    args = parser.parse_args(argumentos)
+
+    if args.uma_vez:
+        resultado = agendadorAtualizacao.executarCiclo()
+        if not resultado['lider']:
+            logger.info("Outro processo já é o líder do agendador; nada a fazer")
+        return 1 if resultado.get('falhas') else 0
+
+    agendadorAtualizacao.executarEmLaco(0)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config.settings import logger
+from src.services.consulta_tabela import ColunasOpcao
+from src.services.motor_coleta import ESQUEMAS
+from src.utils.armazem_colunar import ArmazemColunar, armazemColunar
+from src.utils.cache import ChaveColeta
+from src.utils.normalizacao import normalizarSerie
+
+# Métricas de cada linha: (coluna base, sufixo das colunas derivadas)
+METRICAS = (('quantidade', ''), ('valor', 'Valor'))
+
+
+def _base(df: pd.DataFrame, colunas: ColunasOpcao) -> pd.DataFrame:
+    """Colunas comuns às abas: produto, categoria (pai), quantidade, valor e a chave de junção."""
+    base = pd.DataFrame({'produto': df[colunas.nome].astype(str).to_numpy(dtype=object)})
+    if colunas.categoriaPai is not None:
+        ehPai = df[colunas.ehPai].astype(bool).to_numpy()
+        base['categoria'] = np.where(ehPai, None, df[colunas.categoriaPai].to_numpy(dtype=object))
+    else:
+        base['categoria'] = None
+    base['quantidade'] = df[colunas.quantidade].to_numpy()
+    if colunas.valor is not None:
+        base['valor'] = df[colunas.valor].to_numpy()
+    # Linhas casadas entre anos pelo nome normalizado dentro da mesma categoria
+    base['_chave'] = (
+        normalizarSerie(base['categoria'].fillna('')) + '|' + normalizarSerie(base['produto'])
+    )
+    return base
+
+
+def calcularAgregados(atual: pd.DataFrame, anterior: Optional[pd.DataFrame],
+                      colunas: ColunasOpcao) -> pd.DataFrame:
+    """Participação no Total, variação sobre o ano anterior, ranking e preço por kg de cada linha.
+
+    Tudo vetorizado sobre as colunas do ano: a participação divide pelo valor da
+    linha Total (ou pela soma das linhas de topo, se ela faltar); o ranking é por
+    quantidade decrescente, das categorias entre si e dos filhos dentro da sua
+    categoria; a variação fica nula quando o item não existia ou era zero no ano
+    anterior. O preço por kg (valor / quantidade) só existe nas abas com valor.
+    """
+    base = _base(atual, colunas)
+    ehTotal = base['produto'].eq('Total').to_numpy()
+    ehTopo = base['categoria'].isna().to_numpy() & ~ehTotal
+    metricas = [(coluna, sufixo) for coluna, sufixo in METRICAS if coluna in base.columns]
+
+    previo = None
+    if anterior is not None:
+        previo = _base(anterior, colunas).drop_duplicates('_chave').set_index('_chave')
+
+    for coluna, sufixo in metricas:
+        valores = base[coluna]
+        total = valores[ehTotal].iloc[0] if ehTotal.any() else valores[ehTopo].sum()
+        base['participacao' + sufixo] = valores / total if total else np.nan
+        if previo is not None:
+            valoresAnteriores = base['_chave'].map(previo[coluna])
+            base['variacaoAnual' + sufixo] = (
+                (valores - valoresAnteriores) / valoresAnteriores.where(valoresAnteriores > 0)
+            )
+        else:
+            base['variacaoAnual' + sufixo] = np.nan
+
+    grupos = base['categoria'].fillna('').where(~ehTotal, None)
+    base['ranking'] = (
+        base['quantidade'].where(~ehTotal).groupby(grupos, dropna=True)
+        .rank(method='min', ascending=False).astype('Int64')
+    )
+
+    if colunas.valor is not None:
+        base['precoKg'] = base['valor'] / base['quantidade'].where(base['quantidade'] > 0)
+    return base.drop(columns='_chave')
+
+
+def registrosAgregados(
+    agregados: pd.DataFrame, top: Optional[int] = None
+) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Separa a linha Total das demais e converte para dicionários (NaN vira None)."""
+    ehTotal = agregados['produto'].eq('Total')
+    linhas = agregados[~ehTotal]
+    if top is not None:
+        linhas = linhas[linhas['ranking'] <= top]
+        if linhas['categoria'].isna().all():
+            linhas = linhas.sort_values('ranking', kind='stable')
+        else:
+            # Nas abas com categorias o corte vale primeiro para elas: os produtos só ficam
+            # se a sua categoria também ficou
+            categorias = linhas.loc[linhas['categoria'].isna(), 'produto']
+            linhas = linhas[linhas['categoria'].isna() | linhas['categoria'].isin(categorias)]
+
+    def registros(df: pd.DataFrame) -> List[Dict[str, Any]]:
+        return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+    total = registros(agregados[ehTotal].drop(columns=['categoria', 'ranking']))
+    return (total[0] if total else None), registros(linhas)
+
+
+class AgregadosTabela:
+    """Agregados por (ano, opcao, subopcao), materializados junto dos dados coletados.
+
+    Cada tabela-ano é calculada uma vez por versão dos dados de origem (a do ano e
+    a do ano anterior) e gravada no armazém colunar; até os dados mudarem, as
+    consultas leem o resultado pronto da memória do worker ou do Parquet.
+    """
+
+    def __init__(self, armazem: ArmazemColunar):
+        self.armazem = armazem
+        self._memoria: Dict[ChaveColeta, Tuple[str, pd.DataFrame]] = {}
+        self._trava = threading.Lock()
+        self.calculos = 0
+        self.acertosMemoria = 0
+        self.acertosArmazem = 0
+
+    @staticmethod
+    def versaoOrigem(atual: pd.DataFrame, anterior: Optional[pd.DataFrame]) -> Optional[str]:
+        versaoAtual = atual.attrs.get('versao')
+        if versaoAtual is None:
+            return None
+        return f"{versaoAtual}:{anterior.attrs.get('versao', '') if anterior is not None else ''}"
+
+    def obter(self, chave: ChaveColeta, atual: pd.DataFrame,
+              anterior: Optional[pd.DataFrame]) -> pd.DataFrame:
+        versao = self.versaoOrigem(atual, anterior)
+        if versao is not None:
+            with self._trava:
+                memorizado = self._memoria.get(chave)
+            if memorizado is not None and memorizado[0] == versao:
+                self.acertosMemoria += 1
+                return memorizado[1]
+            agregados = self.armazem.obterAgregados(chave, versao)
+            if agregados is not None:
+                self.acertosArmazem += 1
+                return self._memorizar(chave, versao, agregados)
+
+        _, opcao, _ = chave
+        agregados = calcularAgregados(atual, anterior, ColunasOpcao.doEsquema(ESQUEMAS[opcao]))
+        self.calculos += 1
+        if versao is None:
+            return agregados
+        self.armazem.gravarAgregados(chave, agregados, versao)
+        return self._memorizar(chave, versao, agregados)
+
+    def _memorizar(self, chave: ChaveColeta, versao: str, agregados: pd.DataFrame) -> pd.DataFrame:
+        agregados.attrs['versaoOrigem'] = versao
+        with self._trava:
+            self._memoria[chave] = (versao, agregados)
+        return agregados
+
+    def materializarSerie(self, opcao: str, subopcao: Optional[str], anos: List[int]) -> int:
+        """Calcula de antemão os agregados dos anos já gravados no armazém (após a ingestão)."""
+        calculados = 0
+        anterior = None
+        anos = sorted(anos)
+        if anos:
+            self.armazem.carregarAnos(opcao, subopcao, [anos[0] - 1, *anos])
+        for ano in anos:
+            atual = self.armazem.obterAno((ano, opcao, subopcao))
+            if atual is None:
+                anterior = None
+                continue
+            if anterior is None:
+                anterior = self.armazem.obterAno((ano - 1, opcao, subopcao))
+            try:
+                self.obter((ano, opcao, subopcao), atual, anterior)
+                calculados += 1
+            except Exception as e:
+                logger.warning(
+                    f"Falha ao calcular os agregados de {opcao}/{subopcao or '-'} em {ano}: {e}"
+                )
+            anterior = atual
+        return calculados
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._trava:
+            emMemoria = len(self._memoria)
+        return {
+            "tabelasAnoEmMemoria": emMemoria,
+            "calculos": self.calculos,
+            "acertosMemoria": self.acertosMemoria,
+            "acertosArmazem": self.acertosArmazem
+        }
+
+
+agregadosTabela = AgregadosTabela(armazemColunar)
@@ -0,0 +1,105 @@
+import contextvars
+import math
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.utils.prazo import ampliarPrazo
+
+
+class ColetaParalela:
+    """Executa coletas por ano num pool de threads limitado e compartilhado pelo worker.
+
+    O pool é único por processo, então o limite vale para todas as requisições
+    simultâneas do worker e protege o site da Embrapa de rajadas.
+    """
+
+    def __init__(self, maximoSimultaneas: int):
+        self.maximoSimultaneas = maximoSimultaneas
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._trava = threading.Lock()
+
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            with self._trava:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.maximoSimultaneas, thread_name_prefix='coleta-ano'
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    def ampliarPrazoPara(self, anos: int) -> None:
+        """Um prazo de requisição por rodada de `maximoSimultaneas` anos, até o teto configurado.
+
+        Sem isso todos os anos dividiriam o prazo de um único ano e, com o cache
+        frio, os últimos anos de um intervalo longo falhariam por prazo esgotado.
+        """
+        rodadas = max(1, math.ceil(anos / self.maximoSimultaneas))
+        ampliarPrazo(min(
+            Configuracao.HTTP_PRAZO_REQUISICAO * rodadas, Configuracao.HTTP_PRAZO_INTERVALO_MAXIMO
+        ))
+
+    def executarPorAno(self, funcao: Callable[[int], Any],
+                       anos: Iterable[int]) -> Tuple[Dict[int, Any], Dict[int, str]]:
+        anos = list(anos)
+        self.ampliarPrazoPara(len(anos))
+        # Cada tarefa herda o contexto da requisição (inclusive o prazo para ir ao site)
+        futuros = {
+            self.executor().submit(contextvars.copy_context().run, funcao, ano): ano for ano in anos
+        }
+        resultados: Dict[int, Any] = {}
+        falhas: Dict[int, str] = {}
+
+        for futuro in as_completed(futuros):
+            ano = futuros[futuro]
+            try:
+                resultados[ano] = futuro.result()
+            except Exception as e:
+                logger.warning(f"Falha ao coletar o ano {ano}: {e}")
+                falhas[ano] = str(e)
+
+        return dict(sorted(resultados.items())), dict(sorted(falhas.items()))
+
+    def iterarPorAno(self, funcao: Callable[[int], Any],
+                     anos: Iterable[int]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+        """Como executarPorAno, mas entrega (ano, resultado, erro) em ordem, à medida que terminam.
+
+        Só `maximoSimultaneas` anos ficam adiantados, então a memória não cresce
+        com o tamanho do intervalo (usado nas respostas em streaming).
+        """
+        anos = list(anos)
+        self.ampliarPrazoPara(len(anos))
+        pendentes: Deque[Tuple[int, Any]] = deque()
+        restantes = iter(anos)
+
+        def submeter() -> None:
+            for ano in restantes:
+                futuro = self.executor().submit(contextvars.copy_context().run, funcao, ano)
+                pendentes.append((ano, futuro))
+                return
+
+        try:
+            for _ in range(self.maximoSimultaneas):
+                submeter()
+            while pendentes:
+                ano, futuro = pendentes.popleft()
+                submeter()
+                try:
+                    resultado, erro = futuro.result(), None
+                except Exception as e:
+                    logger.warning(f"Falha ao coletar o ano {ano}: {e}")
+                    resultado, erro = None, str(e)
+                yield ano, resultado, erro
+        finally:
+            # Cliente desconectou no meio do stream: anos ainda não iniciados são descartados
+            for _, futuro in pendentes:
+                futuro.cancel()
+
+
+coletaParalela = ColetaParalela(Configuracao.COLETA_CONCORRENCIA_MAXIMA)
@@ -0,0 +1,211 @@
+"""Coleta em massa assíncrona (httpx + asyncio) de todas as combinações ano x opção x subopção.
+
+Uso pela linha de comando:
+    python -m src.services.coletor_assincrono --ano-inicio 1970 --ano-fim 2023 \
+        --opcoes opt_05,opt_06
+
+Os DataFrames são gerados pelos mesmos parsers do `MotorColeta` e gravados
+no armazém colunar e no cache, de onde a API passa a servi-los.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from urllib.parse import urlsplit
+
+import httpx
+import pandas as pd
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.services.motor_coleta import ESQUEMAS, MotorColeta, motorColeta
+from src.utils.armazem_colunar import ORIGEM_RASPAGEM, armazemColunar
+from src.utils.disjuntor import disjuntorEmbrapa
+from src.utils.cache import ChaveColeta, normalizarChave, registrarColeta
+
+STATUS_RETENTATIVA = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class TarefaColeta:
+    ano: int
+    opcao: str
+    subopcao: Optional[str]
+
+    @property
+    def chave(self) -> ChaveColeta:
+        return normalizarChave(self.ano, self.opcao, self.subopcao)
+
+
+class LimitadorTaxa:
+    """Espaça as requisições a um mesmo host em intervalos mínimos (requisições por segundo)."""
+
+    def __init__(self, requisicoesPorSegundo: float):
+        self.intervalo = 1.0 / requisicoesPorSegundo if requisicoesPorSegundo > 0 else 0.0
+        self._proximo = 0.0
+        self._trava = asyncio.Lock()
+
+    async def aguardar(self) -> None:
+        if not self.intervalo:
+            return
+        async with self._trava:
+            agora = asyncio.get_running_loop().time()
+            espera = self._proximo - agora
+            if espera > 0:
+                await asyncio.sleep(espera)
+                agora += espera
+            self._proximo = agora + self.intervalo
+
+
+class ColetorAssincrono:
+    def __init__(self, maximoSimultaneas: Optional[int] = None,
+                 requisicoesPorSegundo: Optional[float] = None,
+                 retentativas: Optional[int] = None, motor: Optional[MotorColeta] = None):
+        self.maximoSimultaneas = maximoSimultaneas or Configuracao.COLETA_ASSINCRONA_CONCORRENCIA
+        self.requisicoesPorSegundo = (
+            requisicoesPorSegundo if requisicoesPorSegundo is not None
+            else Configuracao.COLETA_ASSINCRONA_REQUISICOES_POR_SEGUNDO
+        )
+        self.retentativas = (
+            retentativas if retentativas is not None else Configuracao.HTTP_RETENTATIVAS
+        )
+        self.motor = motor or motorColeta
+        self._limitadores: Dict[str, LimitadorTaxa] = {}
+
+    def criarCliente(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                Configuracao.HTTP_TIMEOUT_LEITURA, connect=Configuracao.HTTP_TIMEOUT_CONEXAO
+            ),
+            limits=httpx.Limits(
+                max_connections=self.maximoSimultaneas,
+                max_keepalive_connections=self.maximoSimultaneas
+            ),
+            headers={'User-Agent': Configuracao.HTTP_USER_AGENT},
+            follow_redirects=True
+        )
+
+    def _limitador(self, url: str) -> LimitadorTaxa:
+        host = urlsplit(url).netloc
+        if host not in self._limitadores:
+            self._limitadores[host] = LimitadorTaxa(self.requisicoesPorSegundo)
+        return self._limitadores[host]
+
+    async def buscar(self, cliente: httpx.AsyncClient, url: str) -> bytes:
+        for tentativa in range(self.retentativas + 1):
+            await self._limitador(url).aguardar()
+            disjuntorEmbrapa.permitir()
+            inicio = time.monotonic()
+            try:
+                resposta = await cliente.get(url)
+            except httpx.TransportError:
+                disjuntorEmbrapa.registrar(False, time.monotonic() - inicio)
+                if tentativa == self.retentativas:
+                    raise
+            except BaseException:
+                # Cancelamento (prazo, gather) ou erro inesperado: todo permitir() tem o seu
+                # registrar(), senão a vaga de sonda do circuito meio aberto nunca é devolvida
+                disjuntorEmbrapa.registrar(False, time.monotonic() - inicio)
+                raise
+            else:
+                disjuntorEmbrapa.registrar(resposta.status_code < 500, time.monotonic() - inicio)
+                if resposta.status_code not in STATUS_RETENTATIVA or tentativa == self.retentativas:
+                    resposta.raise_for_status()
+                    return resposta.content
+            # Backoff exponencial com jitter, como em ClienteHttp.get
+            await asyncio.sleep(
+                Configuracao.HTTP_BACKOFF * (2 ** tentativa) * (1 + random.random())
+            )
+        raise RuntimeError(f"Retentativas esgotadas para {url}")
+
+    async def coletar(self, cliente: httpx.AsyncClient, semaforo: asyncio.Semaphore,
+                      tarefa: TarefaColeta) -> pd.DataFrame:
+        esquema = ESQUEMAS[tarefa.opcao]
+        chave = tarefa.chave  # valida opção e subopção antes de ir ao site
+        async with semaforo:
+            url = self.motor.montarUrl(tarefa.ano, tarefa.opcao, tarefa.subopcao)
+            conteudo = await self.buscar(cliente, url)
+        # O parsing é CPU: roda fora do event loop para não travar as demais coletas
+        df = await asyncio.to_thread(self.motor.processarConteudo, esquema, conteudo)
+        await asyncio.to_thread(armazemColunar.gravarParticao, chave, df, ORIGEM_RASPAGEM)
+        df = registrarColeta(chave, df)
+        await asyncio.to_thread(self.motor.indexarNomes, esquema, chave, df)
+        return df
+
+    async def coletarTarefas(
+        self, tarefas: Sequence[TarefaColeta]
+    ) -> Dict[ChaveColeta, Union[pd.DataFrame, Exception]]:
+        # Primitivas asyncio ficam presas ao loop em que foram criadas: recria a cada execução
+        semaforo = asyncio.Semaphore(self.maximoSimultaneas)
+        self._limitadores = {}
+        async with self.criarCliente() as cliente:
+            resultados = await asyncio.gather(
+                *(self.coletar(cliente, semaforo, tarefa) for tarefa in tarefas),
+                return_exceptions=True
+            )
+        return {tarefa.chave: resultado for tarefa, resultado in zip(tarefas, resultados)}
+
+
+def montarTarefas(anos: Iterable[int],
+                  opcoes: Optional[Iterable[str]] = None) -> List[TarefaColeta]:
+    tarefas = []
+    for opcao in (opcoes or ESQUEMAS.keys()):
+        subopcoes = ESQUEMAS[opcao].subopcoes or (None,)
+        for ano in anos:
+            for subopcao in subopcoes:
+                tarefas.append(TarefaColeta(ano, opcao, subopcao))
+    return tarefas
+
+
+def coletarMatriz(anos: Iterable[int], opcoes: Optional[Iterable[str]] = None,
+                  **kwargs) -> Dict[ChaveColeta, Union[pd.DataFrame, Exception]]:
+    """API síncrona: coleta todas as combinações de `anos` x `opcoes` x subopções."""
+    tarefas = montarTarefas(list(anos), opcoes)
+    return asyncio.run(ColetorAssincrono(**kwargs).coletarTarefas(tarefas))
+
+
+def main(argumentos: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Coleta em massa dos dados do vitibrasil.')
+    parser.add_argument('--ano-inicio', type=int, default=1970)
+    parser.add_argument('--ano-fim', type=int, default=Configuracao.ANO_PADRAO)
+    parser.add_argument('--opcoes', default=','.join(ESQUEMAS.keys()),
+                        help='Opções separadas por vírgula (padrão: todas)')
+    parser.add_argument('--concorrencia', type=int,
+                        default=Configuracao.COLETA_ASSINCRONA_CONCORRENCIA)
+    parser.add_argument('--taxa', type=float,
+                        default=Configuracao.COLETA_ASSINCRONA_REQUISICOES_POR_SEGUNDO,
+                        help='Máximo de requisições por segundo ao site (0 = sem limite)')
+    args = parser.parse_args(argumentos)
+
+    opcoes = [opcao.strip() for opcao in args.opcoes.split(',') if opcao.strip()]
+    invalidas = [opcao for opcao in opcoes if opcao not in ESQUEMAS]
+    if invalidas:
+        parser.error(f"Opções não reconhecidas: {', '.join(invalidas)}")
+
+    tarefas = montarTarefas(range(args.ano_inicio, args.ano_fim + 1), opcoes)
+    logger.info(
+        f"Coletando {len(tarefas)} páginas com concorrência {args.concorrencia} "
+        f"e taxa {args.taxa}/s"
+    )
+
+    inicio = time.perf_counter()
+    coletor = ColetorAssincrono(
+        maximoSimultaneas=args.concorrencia, requisicoesPorSegundo=args.taxa
+    )
+    resultados = asyncio.run(coletor.coletarTarefas(tarefas))
+    falhas = {chave: erro for chave, erro in resultados.items() if isinstance(erro, Exception)}
+
+    for chave, erro in falhas.items():
+        logger.error(f"Falha em {chave}: {erro}")
+    logger.info(
+        f"{len(resultados) - len(falhas)}/{len(resultados)} páginas coletadas "
+        f"em {time.perf_counter() - inicio:.1f}s"
+    )
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import pandas as pd
+
+from src.services.motor_coleta import ESQUEMAS, EsquemaOpcao
+from src.utils.normalizacao import normalizarNome, normalizarSerie
+
+CAMPOS_ITEM = ('produto', 'quantidade', 'valor', 'subitem')
+
+
+class ConsultaInvalidaError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ColunasOpcao:
+    """Nomes das colunas do DataFrame de uma aba (os da produção são renomeados)."""
+    nome: str
+    quantidade: str
+    valor: Optional[str]
+    categoriaPai: Optional[str]
+    ehPai: Optional[str]
+
+    @classmethod
+    def doEsquema(cls, esquema: EsquemaOpcao) -> 'ColunasOpcao':
+        renomear = esquema.renomearColunas
+        numericas = [coluna.nome for coluna in esquema.colunasNumericas]
+        hierarquia = esquema.hierarquia
+        return cls(
+            nome=renomear.get(esquema.colunaNome, esquema.colunaNome),
+            quantidade=renomear.get(numericas[0], numericas[0]),
+            valor=renomear.get('valor', 'valor') if 'valor' in numericas else None,
+            categoriaPai=renomear.get('categoriaPai', 'categoriaPai') if hierarquia else None,
+            ehPai=renomear.get('ehPai', 'ehPai') if hierarquia else None
+        )
+
+    def coluna(self, campo: str) -> Optional[str]:
+        """Coluna do DataFrame que dá origem a um campo dos itens da resposta."""
+        return {'produto': self.nome, 'quantidade': self.quantidade, 'valor': self.valor}.get(campo)
+
+
+@dataclass(frozen=True)
+class ParametrosConsulta:
+    """Filtro, projeção, ordenação e paginação pedidos na query string de /embrapa_data."""
+    nomes: Tuple[str, ...] = ()
+    prefixo: Optional[str] = None
+    campos: Tuple[str, ...] = ()
+    ordenar: Optional[str] = None
+    top: Optional[int] = None
+    limite: Optional[int] = None
+    deslocamento: int = 0
+
+    @property
+    def ativa(self) -> bool:
+        return self != ParametrosConsulta()
+
+    @property
+    def paginada(self) -> bool:
+        return self.limite is not None or self.deslocamento > 0
+
+    @classmethod
+    def deArgumentos(cls, argumentos: Mapping[str, Any]) -> 'ParametrosConsulta':
+        """Lê nome (repetível), prefixo, campos, ordenar, top, limite, deslocamento e cursor."""
+        def inteiro(nome: str) -> Optional[int]:
+            valor = argumentos.get(nome)
+            if valor in (None, ''):
+                return None
+            try:
+                numero = int(valor)
+            except ValueError:
+                raise ConsultaInvalidaError(f"'{nome}' deve ser um número inteiro")
+            if numero < 0:
+                raise ConsultaInvalidaError(f"'{nome}' não pode ser negativo")
+            return numero
+
+        nomes = tuple(
+            nome.strip() for valor in argumentos.getlist('nome') for nome in valor.split('|')
+            if nome.strip()
+        )
+        campos = tuple(
+            campo.strip() for campo in argumentos.get('campos', '').split(',') if campo.strip()
+        )
+        invalidos = [campo for campo in campos if campo not in CAMPOS_ITEM]
+        if invalidos:
+            raise ConsultaInvalidaError(
+                f"Campos não reconhecidos: {', '.join(invalidos)} (use {', '.join(CAMPOS_ITEM)})"
+            )
+        ordenar = argumentos.get('ordenar') or None
+        if ordenar is not None and ordenar.lstrip('-') not in ('produto', 'quantidade', 'valor'):
+            raise ConsultaInvalidaError(
+                "'ordenar' deve ser produto, quantidade ou valor (prefixe '-' para decrescente)"
+            )
+
+        deslocamento = inteiro('deslocamento') or 0
+        if argumentos.get('cursor'):
+            deslocamento = lerCursor(argumentos['cursor'])
+        return cls(
+            nomes=nomes,
+            prefixo=argumentos.get('prefixo') or None,
+            campos=campos,
+            ordenar=ordenar,
+            top=inteiro('top'),
+            limite=inteiro('limite'),
+            deslocamento=deslocamento
+        )
+
+    def validarOpcao(self, opcao: str) -> None:
+        if not self.ordenar:
+            return
+        campo = self.ordenar.lstrip('-')
+        if ColunasOpcao.doEsquema(ESQUEMAS[opcao]).coluna(campo) is None:
+            raise ConsultaInvalidaError(f"A opção {opcao} não tem o campo '{campo}'")
+
+
+def criarCursor(deslocamento: int) -> str:
+    conteudo = json.dumps({"d": deslocamento}).encode('utf-8')
+    return base64.urlsafe_b64encode(conteudo).decode('ascii').rstrip('=')
+
+
+def lerCursor(cursor: str) -> int:
+    try:
+        deslocamento = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))['d']
+    except (ValueError, KeyError, TypeError):
+        raise ConsultaInvalidaError("'cursor' inválido")
+    if not isinstance(deslocamento, int) or deslocamento < 0:
+        raise ConsultaInvalidaError("'cursor' inválido")
+    return deslocamento
+
+
+def aplicarConsulta(df: pd.DataFrame, opcao: str,
+                    consulta: ParametrosConsulta) -> Tuple[pd.DataFrame, Optional[Dict[str, Any]]]:
+    """Filtra, ordena e pagina as linhas de topo de `df` antes do formatarDados.
+
+    Nas abas com hierarquia as categorias são as linhas de topo e seus filhos as
+    acompanham: uma categoria entra se o nome dela ou de algum filho casar com o
+    filtro (com o filho, só os filhos que casaram). A linha Total é mantida como
+    está, com o total da tabela inteira. Devolve o DataFrame e, se houve
+    paginação, os dados para a próxima página.
+    """
+    colunas = ColunasOpcao.doEsquema(ESQUEMAS[opcao])
+    ehTotal = df[colunas.nome] == 'Total'
+    total, linhas = df[ehTotal], df[~ehTotal]
+    if colunas.ehPai is not None:
+        ehPai = linhas[colunas.ehPai].astype(bool)
+        topo, filhos = linhas[ehPai], linhas[~ehPai]
+    else:
+        topo, filhos = linhas, linhas.iloc[0:0]
+
+    if consulta.nomes or consulta.prefixo:
+        topo, filhos = _filtrarPorNome(topo, filhos, colunas, consulta)
+
+    ordenar = consulta.ordenar or ('-quantidade' if consulta.top is not None else None)
+    if ordenar:
+        coluna = colunas.coluna(ordenar.lstrip('-'))
+        chave = normalizarSerie if coluna == colunas.nome else None
+        topo = topo.sort_values(
+            coluna, ascending=not ordenar.startswith('-'), kind='stable', key=chave
+        )
+    if consulta.top is not None:
+        topo = topo.head(consulta.top)
+
+    paginacao = None
+    if consulta.paginada:
+        quantidadeTotal = len(topo)
+        fim = quantidadeTotal
+        if consulta.limite is not None:
+            fim = consulta.deslocamento + consulta.limite
+        topo = topo.iloc[consulta.deslocamento:fim]
+        paginacao = {
+            "total": quantidadeTotal,
+            "deslocamento": consulta.deslocamento,
+            "limite": consulta.limite,
+            "proximoCursor": criarCursor(fim) if fim < quantidadeTotal else None
+        }
+
+    if colunas.categoriaPai is not None:
+        filhos = filhos[filhos[colunas.categoriaPai].isin(topo[colunas.nome])]
+    return pd.concat([topo, filhos, total]), paginacao
+
+
+def _filtrarPorNome(topo: pd.DataFrame, filhos: pd.DataFrame, colunas: ColunasOpcao,
+                    consulta: ParametrosConsulta) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # Comparação sem acentos e sem diferenciar maiúsculas
+    nomes = {normalizarNome(nome) for nome in consulta.nomes}
+    prefixo = normalizarNome(consulta.prefixo) if consulta.prefixo else None
+
+    def casa(linhas: pd.DataFrame) -> pd.Series:
+        normalizados = normalizarSerie(linhas[colunas.nome])
+        resultado = pd.Series(False, index=linhas.index)
+        if nomes:
+            resultado |= normalizados.isin(nomes)
+        if prefixo:
+            resultado |= normalizados.str.startswith(prefixo)
+        return resultado
+
+    topoCasou = casa(topo)
+    if colunas.categoriaPai is None:
+        return topo[topoCasou], filhos
+
+    filhosCasaram = casa(filhos)
+    paisCasaram = set(topo.loc[topoCasou, colunas.nome])
+    paisDosFilhos = set(filhos.loc[filhosCasaram, colunas.categoriaPai])
+    topo = topo[topo[colunas.nome].isin(paisCasaram | paisDosFilhos)]
+    filhos = filhos[filhosCasaram | filhos[colunas.categoriaPai].isin(paisCasaram)]
+    return topo, filhos
+
+
+def projetarItens(itens: List[Dict[str, Any]], campos: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Mantém em cada item (e subitem) só os `campos` pedidos."""
+    if not campos:
+        return itens
+    projetados = []
+    for item in itens:
+        projetado = {campo: item[campo] for campo in campos if campo in item}
+        if 'subitem' in projetado:
+            projetado['subitem'] = projetarItens(projetado['subitem'], campos)
+        projetados.append(projetado)
+    return projetados
+
+
+def projetarColunas(df: pd.DataFrame, opcao: str, campos: Tuple[str, ...]) -> pd.DataFrame:
+    """Projeção para os formatos colunares: `ano` mais as colunas dos `campos` pedidos."""
+    if not campos:
+        return df
+    colunas = ColunasOpcao.doEsquema(ESQUEMAS[opcao])
+    selecionadas = [
+        colunas.coluna(campo) for campo in campos if colunas.coluna(campo) in df.columns
+    ]
+    return df[[coluna for coluna in df.columns if coluna == 'ano' or coluna in selecionadas]]
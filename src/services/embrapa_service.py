@@ -3,6 +3,7 @@ import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 from src.config.settings import logger
+from src.utils.cliente_http import clienteHttp
 
 def crawl_embrapa(year, hierarchical=True):
     
@@ -10,8 +11,7 @@ def crawl_embrapa(year, hierarchical=True):
     logger.info(f"Crawling Embrapa data for year {year} from {url}")
     
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        response = clienteHttp.get(url)
     except requests.RequestException as e:
         logger.error(f"Failed to fetch data from Embrapa: {e}")
         raise
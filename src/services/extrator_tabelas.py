@@ -0,0 +1,54 @@
+import re
+from dataclasses import dataclass
+from typing import List
+
+from lxml import html
+
+# Tabelas de dados do vitibrasil: <table class="tb_base tb_dados">
+XPATH_LINHAS = (
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' tb_base ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' tb_dados ')]//tr"
+)
+PADRAO_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+@dataclass
+class LinhaTabela:
+    celulas: List[str]
+    ehPai: bool
+
+
+def detectarCodificacao(conteudo: bytes) -> str:
+    encontrado = PADRAO_CHARSET.search(conteudo[:4096])
+    if encontrado:
+        return encontrado.group(1).decode('ascii').lower()
+    try:
+        conteudo.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+def extrairLinhas(conteudo: bytes) -> List[LinhaTabela]:
+    """Extrai as linhas das tabelas `tb_base tb_dados` de uma página do vitibrasil.
+
+    Cada linha traz o texto já normalizado das células <td> e se a primeira
+    célula é um item pai (classe `tb_item`). Linhas sem <td>, como cabeçalhos
+    com <th>, são descartadas.
+    """
+    if not conteudo:
+        return []
+
+    parser = html.HTMLParser(encoding=detectarCodificacao(conteudo))
+    documento = html.document_fromstring(conteudo, parser=parser)
+
+    linhas: List[LinhaTabela] = []
+    for tr in documento.xpath(XPATH_LINHAS):
+        tds = tr.xpath('./td')
+        if not tds:
+            continue
+        celulas = [td.text_content().strip() for td in tds]
+        ehPai = 'tb_item' in (tds[0].get('class') or '').split()
+        linhas.append(LinhaTabela(celulas, ehPai))
+
+    return linhas
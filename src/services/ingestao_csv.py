@@ -0,0 +1,183 @@
+"""Ingestão offline dos CSVs do link "DOWNLOAD" do vitibrasil no armazém colunar.
+
+Uso pela linha de comando (os arquivos ficam em DADOS_CSV_DIRETORIO):
+    python -m src.services.ingestao_csv --diretorio dados/csv
+
+Cada CSV traz a série completa de uma aba (uma coluna por ano); uma única
+leitura substitui dezenas de páginas HTML raspadas ano a ano.
+"""
+import argparse
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.services.agregados import AgregadosTabela
+from src.services.motor_coleta import ESQUEMAS, EsquemaOpcao
+from src.utils.armazem_colunar import ArmazemColunar, armazemColunar
+
+ARQUIVOS_CSV: Dict[Tuple[str, Optional[str]], str] = {
+    (Configuracao.OPCAO_PRODUCAO, None): 'Producao.csv',
+    (Configuracao.OPCAO_PROCESSAMENTO, 'subopt_01'): 'ProcessaViniferas.csv',
+    (Configuracao.OPCAO_PROCESSAMENTO, 'subopt_02'): 'ProcessaAmericanas.csv',
+    (Configuracao.OPCAO_PROCESSAMENTO, 'subopt_03'): 'ProcessaMesa.csv',
+    (Configuracao.OPCAO_PROCESSAMENTO, 'subopt_04'): 'ProcessaSemclass.csv',
+    (Configuracao.OPCAO_COMERCIALIZACAO, None): 'Comercio.csv',
+    (Configuracao.OPCAO_IMPORTACAO, 'subopt_01'): 'ImpVinhos.csv',
+    (Configuracao.OPCAO_IMPORTACAO, 'subopt_02'): 'ImpEspumantes.csv',
+    (Configuracao.OPCAO_IMPORTACAO, 'subopt_03'): 'ImpFrescas.csv',
+    (Configuracao.OPCAO_IMPORTACAO, 'subopt_04'): 'ImpPassas.csv',
+    (Configuracao.OPCAO_IMPORTACAO, 'subopt_05'): 'ImpSuco.csv',
+    (Configuracao.OPCAO_EXPORTACAO, 'subopt_01'): 'ExpVinho.csv',
+    (Configuracao.OPCAO_EXPORTACAO, 'subopt_02'): 'ExpEspumantes.csv',
+    (Configuracao.OPCAO_EXPORTACAO, 'subopt_03'): 'ExpUva.csv',
+    (Configuracao.OPCAO_EXPORTACAO, 'subopt_04'): 'ExpSuco.csv',
+}
+
+PADRAO_ANO = re.compile(r'^\d{4}$')
+
+
+def lerCsvEmbrapa(caminho: str) -> pd.DataFrame:
+    """Lê um CSV do vitibrasil como texto, sem cabeçalho (anos se repetem nas de import/export)."""
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    try:
+        texto = conteudo.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        texto = conteudo.decode('cp1252')
+
+    # Os arquivos alternam entre ';' e tabulação como separador
+    primeiraLinha = texto.split('\n', 1)[0]
+    separador = ';' if ';' in primeiraLinha else '\t' if '\t' in primeiraLinha else ','
+    linhas = [linha.rstrip('\r').split(separador) for linha in texto.split('\n') if linha.strip()]
+    largura = len(linhas[0])
+    return pd.DataFrame([(linha + [''] * largura)[:largura] for linha in linhas[1:]],
+                        columns=[coluna.strip() for coluna in linhas[0]])
+
+
+def converterNumerosCsv(valores: np.ndarray, tipo: type) -> np.ndarray:
+    # Nos CSVs os números vêm sem separador de milhar; 'nd', '*' e vazios viram 0 como na raspagem
+    numeros = pd.to_numeric(pd.Series(valores.ravel()).str.strip(), errors='coerce')
+    numeros = numeros.to_numpy(dtype='float64')
+    numeros = np.where(np.isfinite(numeros), numeros, 0)
+    return numeros.reshape(valores.shape).astype('int64' if tipo is int else 'float64')
+
+
+def converterSerie(esquema: EsquemaOpcao, bruto: pd.DataFrame) -> pd.DataFrame:
+    """Converte o CSV largo (uma coluna por ano) no formato longo das colunas raspadas."""
+    cabecalho = list(bruto.columns)
+    indicesAnos = [indice for indice, coluna in enumerate(cabecalho) if PADRAO_ANO.match(coluna)]
+    if not indicesAnos:
+        raise ValueError("Nenhuma coluna de ano encontrada no CSV")
+    textos = indicesAnos[0]
+
+    # Colunas iniciais: id, control (só nas abas hierárquicas) e o nome do item
+    nomes = bruto.iloc[:, textos - 1].str.strip()
+    controle = bruto.iloc[:, 1].str.strip() if textos >= 3 else None
+    manter = ~nomes.isin(set(esquema.ignorados) | set(esquema.cabecalhos) | {'', 'Total'})
+    nomes = nomes[manter].to_numpy(dtype=object)
+    bruto = bruto[manter]
+
+    # Anos repetidos (importação/exportação): a n-ésima ocorrência é a n-ésima coluna numérica
+    ocorrencias: Dict[str, List[int]] = {}
+    for indice in indicesAnos:
+        ocorrencias.setdefault(cabecalho[indice], []).append(indice)
+    anos = sorted(ocorrencias, key=int)
+
+    itens, quantidadeAnos = len(nomes), len(anos)
+    longo: Dict[str, np.ndarray] = {
+        'ano': np.repeat(np.array(anos, dtype='int64'), itens + 1),
+        esquema.colunaNome: np.tile(np.append(nomes, 'Total'), quantidadeAnos)
+    }
+
+    if esquema.hierarquia:
+        if controle is not None:
+            ehPai = ~controle[manter].str.contains('_', regex=False).to_numpy(dtype=bool)
+        else:
+            ehPai = np.array([nome.isupper() for nome in nomes], dtype=bool)
+    else:
+        ehPai = np.ones(itens, dtype=bool)
+
+    for coluna in esquema.colunasNumericas:
+        indices = [
+            ocorrencias[ano][coluna.indice - 1] if len(ocorrencias[ano]) >= coluna.indice else None
+            for ano in anos
+        ]
+        tipo = 'int64' if coluna.tipo is int else 'float64'
+        matriz = np.zeros((itens, quantidadeAnos), dtype=tipo)
+        presentes = [posicao for posicao, indice in enumerate(indices) if indice is not None]
+        if presentes:
+            selecionadas = bruto.iloc[:, [indices[posicao] for posicao in presentes]]
+            matriz[:, presentes] = converterNumerosCsv(
+                selecionadas.to_numpy(dtype=object), coluna.tipo
+            )
+        # O total do site soma os itens pai (ou todos, nas abas sem hierarquia)
+        totais = matriz[ehPai].sum(axis=0)
+        longo[coluna.nome] = np.vstack([matriz, totais]).T.ravel()
+
+    for nomeColuna, _ in esquema.colunasTexto:
+        longo[nomeColuna] = np.full(quantidadeAnos * (itens + 1), '', dtype=object)
+
+    if esquema.hierarquia:
+        categorias = np.empty(itens, dtype=object)
+        categoriaPaiAtual = None
+        for posicao in range(itens):
+            if ehPai[posicao]:
+                categoriaPaiAtual = nomes[posicao]
+            else:
+                categorias[posicao] = categoriaPaiAtual
+        longo['categoriaPai'] = np.tile(np.append(categorias, None), quantidadeAnos)
+        longo['ehPai'] = np.tile(np.append(ehPai, True), quantidadeAnos)
+
+    df = pd.DataFrame(longo)
+    if esquema.renomearColunas:
+        df = df.rename(columns=esquema.renomearColunas)
+    return df
+
+
+def ingerirDiretorio(diretorio: str, armazem: Optional[ArmazemColunar] = None) -> Dict[str, int]:
+    """Ingere os CSVs conhecidos de `diretorio`; retorna as linhas gravadas por arquivo."""
+    armazem = armazem or armazemColunar
+    ingeridos: Dict[str, int] = {}
+    for (opcao, subopcao), nomeArquivo in ARQUIVOS_CSV.items():
+        caminho = os.path.join(diretorio, nomeArquivo)
+        if not os.path.exists(caminho):
+            logger.warning(
+                f"{nomeArquivo} não encontrado em {diretorio}; a aba continuará sendo raspada"
+            )
+            continue
+        serie = converterSerie(ESQUEMAS[opcao], lerCsvEmbrapa(caminho))
+        particoes = armazem.gravarSerie(opcao, subopcao, serie)
+        ingeridos[nomeArquivo] = len(serie)
+        logger.info(
+            f"{nomeArquivo}: {len(serie)} linhas em {particoes} anos ({opcao}/{subopcao or '-'})"
+        )
+        # Agregados (participação, variação anual, ranking) materializados junto da série
+        AgregadosTabela(armazem).materializarSerie(opcao, subopcao, serie['ano'].unique().tolist())
+    return ingeridos
+
+
+def main(argumentos: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Ingere os CSVs de download do vitibrasil no armazém colunar.'
+    )
+    parser.add_argument('--diretorio', default=Configuracao.DADOS_CSV_DIRETORIO,
+                        help='Diretório com Producao.csv, ProcessaViniferas.csv etc.')
+    args = parser.parse_args(argumentos)
+
+    if not armazemColunar.habilitado:
+        parser.error("Armazém colunar desabilitado (ARMAZEM_HABILITADO=False ou pyarrow ausente)")
+    ingeridos = ingerirDiretorio(args.diretorio)
+    logger.info(
+        f"{len(ingeridos)}/{len(ARQUIVOS_CSV)} arquivos ingeridos em {armazemColunar.diretorio}"
+    )
+    return 0 if ingeridos else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+
+from src.config.configuracao import Configuracao
+from src.services.extrator_tabelas import extrairLinhas
+from src.utils.armazem_colunar import ORIGEM_CSV, ORIGEM_RASPAGEM, armazemColunar
+from src.utils.cache import (
+    ChaveColeta, cacheDados, cachePersistente, normalizarChave, obterComCache,
+    obterPersistenteObsoleto
+)
+from src.utils.cliente_http import clienteHttp
+from src.utils.indice_nomes import indiceNomes
+from src.utils.registro_acessos import registroAcessos
+
+ESTADO_FRESCO = 'fresco'
+ESTADO_OBSOLETO = 'obsoleto'
+ESTADO_AUSENTE = 'ausente'
+
+
+@dataclass
+class ColunaNumerica:
+    nome: str
+    indice: int
+    tipo: type = int
+
+
+@dataclass
+class EsquemaOpcao:
+    """Descreve como a tabela de uma aba do vitibrasil vira DataFrame."""
+    opcao: str
+    colunaNome: str
+    colunasNumericas: Tuple[ColunaNumerica, ...]
+    colunasTexto: Tuple[Tuple[str, int], ...] = ()
+    hierarquia: bool = True
+    ignorados: Tuple[str, ...] = ()
+    cabecalhos: Tuple[str, ...] = ()
+    minimoColunas: int = 2
+    maximoColunas: Optional[int] = None
+    subopcaoPadrao: Optional[str] = None
+    subopcoes: Tuple[str, ...] = ()
+    renomearColunas: Dict[str, str] = field(default_factory=dict)
+
+
+ESQUEMAS: Dict[str, EsquemaOpcao] = {
+    Configuracao.OPCAO_PRODUCAO: EsquemaOpcao(
+        opcao=Configuracao.OPCAO_PRODUCAO,
+        colunaNome='produto',
+        colunasNumericas=(ColunaNumerica('quantidade', 1),),
+        cabecalhos=('Produto',),
+        maximoColunas=2,
+        renomearColunas={
+            'produto': 'Produto',
+            'quantidade': 'Quantidade (L.)',
+            'categoriaPai': 'Categoria_Pai',
+            'ehPai': 'is_parent'
+        }
+    ),
+    Configuracao.OPCAO_PROCESSAMENTO: EsquemaOpcao(
+        opcao=Configuracao.OPCAO_PROCESSAMENTO,
+        colunaNome='processo',
+        colunasNumericas=(ColunaNumerica('volume', 1),),
+        colunasTexto=(('metodo', 2),),
+        ignorados=tuple(Configuracao.PROCESSOS_IGNORADOS),
+        cabecalhos=('Processo',),
+        subopcaoPadrao=Configuracao.SUBOPCAO_PROCESSAMENTO_PADRAO,
+        subopcoes=Configuracao.SUBOPCOES_POR_OPCAO[Configuracao.OPCAO_PROCESSAMENTO]
+    ),
+    Configuracao.OPCAO_COMERCIALIZACAO: EsquemaOpcao(
+        opcao=Configuracao.OPCAO_COMERCIALIZACAO,
+        colunaNome='produto',
+        colunasNumericas=(ColunaNumerica('quantidade', 1),),
+        ignorados=tuple(Configuracao.PRODUTOS_IGNORADOS),
+        cabecalhos=('Produto',)
+    ),
+    Configuracao.OPCAO_IMPORTACAO: EsquemaOpcao(
+        opcao=Configuracao.OPCAO_IMPORTACAO,
+        colunaNome='pais',
+        colunasNumericas=(ColunaNumerica('quantidade', 1), ColunaNumerica('valor', 2, float)),
+        hierarquia=False,
+        ignorados=tuple(Configuracao.PAISES_IGNORADOS),
+        minimoColunas=3,
+        subopcaoPadrao=Configuracao.SUBOPCAO_IMPORTACAO_PADRAO,
+        subopcoes=Configuracao.SUBOPCOES_POR_OPCAO[Configuracao.OPCAO_IMPORTACAO]
+    ),
+    Configuracao.OPCAO_EXPORTACAO: EsquemaOpcao(
+        opcao=Configuracao.OPCAO_EXPORTACAO,
+        colunaNome='pais',
+        colunasNumericas=(ColunaNumerica('quantidade', 1), ColunaNumerica('valor', 2, float)),
+        hierarquia=False,
+        ignorados=tuple(Configuracao.PAISES_IGNORADOS),
+        minimoColunas=3,
+        subopcaoPadrao=Configuracao.SUBOPCAO_EXPORTACAO_PADRAO,
+        subopcoes=Configuracao.SUBOPCOES_POR_OPCAO[Configuracao.OPCAO_EXPORTACAO]
+    ),
+}
+
+
+def converterNumerosBrasileiros(serie: pd.Series, tipo: type) -> pd.Series:
+    """Converte uma coluna de textos no formato 1.234,56 em int64/float64 numa única passada.
+
+    '-', vazios e qualquer texto não numérico viram 0; inteiros são truncados
+    como em int(float(texto)).
+    """
+    texto = serie.astype(str).str.strip()
+    texto = texto.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    numeros = pd.to_numeric(texto, errors='coerce')
+    numeros = numeros.where(np.isfinite(numeros), 0)
+    if tipo is int:
+        return numeros.astype('int64')
+    return numeros.astype('float64')
+
+
+class MotorColeta:
+    """Pipeline único de coleta: busca a página, extrai a tabela e monta o DataFrame.
+
+    As diferenças entre as abas ficam no `EsquemaOpcao`; cache e deduplicação
+    de coletas concorrentes são aplicados aqui, valendo para todos os serviços.
+    """
+
+    def __init__(self, urlBase: Optional[str] = None):
+        self.urlBase = urlBase or Configuracao.URL_BASE_EMBRAPA
+
+    def montarUrl(self, ano: Any, opcao: str, subopcao: Optional[str] = None) -> str:
+        parametros = {'ano': ano, 'opcao': opcao}
+        if subopcao:
+            parametros['subopcao'] = subopcao
+        return f"{self.urlBase}?{urlencode(parametros)}"
+
+    def coletar(self, esquema: EsquemaOpcao, ano: Any, opcao: Optional[str] = None,
+                subopcao: Optional[str] = None) -> pd.DataFrame:
+        opcao = opcao or esquema.opcao
+        subopcao = subopcao or esquema.subopcaoPadrao
+        # Levanta ChaveInvalidaError para subopções que a opção não tem
+        chave = normalizarChave(ano, opcao, subopcao)
+        # Memória do worker, depois o armazém colunar (camada principal); a raspagem só acontece
+        # para anos ausentes ou expirados
+        df = obterComCache(
+            chave,
+            lambda: self.rasparEArmazenar(esquema, chave),
+            lambda: self.obterObsoleto(chave),
+            lambda: self.obterArmazenado(chave)
+        )
+        # Só chaves servidas com sucesso, com alguma linha além do Total (ano existente no site),
+        # entram no ranking que o agendador mantém aquecido
+        if len(df) > 1:
+            registroAcessos.registrar(chave)
+        self.indexarNomes(esquema, chave, df)
+        return df
+
+    def indexarNomes(self, esquema: EsquemaOpcao, chave: ChaveColeta, df: pd.DataFrame) -> None:
+        """Mantém o índice de nomes em dia com o ano servido (só reindexa quando a versão muda)."""
+        colunaNome = esquema.renomearColunas.get(esquema.colunaNome, esquema.colunaNome)
+        indiceNomes.indexar(chave, df, colunaNome)
+
+    def estadoLocal(self, chave: ChaveColeta) -> str:
+        """Diz, sem ir ao site, se `chave` sairia fresca, obsoleta ou exigiria coleta."""
+        metadados = armazemColunar.metadados(chave)
+        if metadados is not None:
+            origem, coletadoEm = metadados
+            idade = 0.0 if origem == ORIGEM_CSV else time.time() - coletadoEm
+        else:
+            idade = cacheDados.idade(chave)
+            if idade is None:
+                entrada = cachePersistente.obter(chave)
+                idade = time.time() - entrada[1] if entrada is not None else None
+        if idade is None:
+            return ESTADO_AUSENTE
+        ttl = cacheDados.ttlPara(chave)
+        if idade < ttl:
+            return ESTADO_FRESCO
+        if idade <= ttl + Configuracao.CACHE_OBSOLETO_REVALIDANDO:
+            return ESTADO_OBSOLETO
+        return ESTADO_AUSENTE
+
+    def obterArmazenado(self, chave: ChaveColeta) -> Optional[pd.DataFrame]:
+        df = armazemColunar.obterAno(chave, cacheDados.ttlPara(chave))
+        if df is not None:
+            # Promove para a memória: partições de raspagem expiram contando da coleta original
+            criadoEm = df.attrs['coletadoEm'] if df.attrs.get('origem') == ORIGEM_RASPAGEM else None
+            cacheDados.gravar(chave, df, criadoEm=criadoEm)
+        return df
+
+    def obterObsoleto(self, chave: ChaveColeta) -> Optional[pd.DataFrame]:
+        # Última cópia conhecida, mesmo vencida: partição do armazém ou entrada do cache em disco
+        df = armazemColunar.obterAno(chave)
+        return df if df is not None else obterPersistenteObsoleto(chave)
+
+    def rasparEArmazenar(self, esquema: EsquemaOpcao, chave: ChaveColeta) -> pd.DataFrame:
+        ano, opcao, subopcao = chave
+        df = self.raspar(esquema, ano, opcao, subopcao)
+        armazemColunar.gravarParticao(chave, df, ORIGEM_RASPAGEM)
+        return df
+
+    def raspar(self, esquema: EsquemaOpcao, ano: Any, opcao: str,
+               subopcao: Optional[str]) -> pd.DataFrame:
+        resposta = clienteHttp.get(self.montarUrl(ano, opcao, subopcao))
+        return self.processarConteudo(esquema, resposta.content)
+
+    def processarConteudo(self, esquema: EsquemaOpcao, conteudo: bytes) -> pd.DataFrame:
+        dados: List[Dict[str, Any]] = []
+        # Os números ficam como texto até o fim e são convertidos de uma vez por coluna
+        totais = {coluna.nome: '0' for coluna in esquema.colunasNumericas}
+        categoriaPaiAtual = None
+
+        for linha in extrairLinhas(conteudo):
+            colunas = linha.celulas
+            if len(colunas) < esquema.minimoColunas:
+                continue
+            if esquema.maximoColunas is not None and len(colunas) > esquema.maximoColunas:
+                continue
+
+            nome = colunas[0]
+            if nome in esquema.cabecalhos or nome in esquema.ignorados:
+                continue
+
+            if nome == 'Total':
+                for coluna in esquema.colunasNumericas:
+                    totais[coluna.nome] = colunas[coluna.indice]
+                continue
+
+            registro: Dict[str, Any] = {esquema.colunaNome: nome}
+            for coluna in esquema.colunasNumericas:
+                registro[coluna.nome] = colunas[coluna.indice]
+            for nomeColuna, indice in esquema.colunasTexto:
+                registro[nomeColuna] = colunas[indice] if len(colunas) > indice else ''
+
+            if esquema.hierarquia:
+                if linha.ehPai:
+                    categoriaPaiAtual = nome
+                    registro['categoriaPai'] = None
+                else:
+                    registro['categoriaPai'] = categoriaPaiAtual
+                registro['ehPai'] = linha.ehPai
+
+            dados.append(registro)
+
+        linhaTotal: Dict[str, Any] = {esquema.colunaNome: 'Total', **totais}
+        for nomeColuna, _ in esquema.colunasTexto:
+            linhaTotal[nomeColuna] = ''
+        if esquema.hierarquia:
+            linhaTotal['categoriaPai'] = None
+            linhaTotal['ehPai'] = True
+        dados.append(linhaTotal)
+
+        df = pd.DataFrame(dados)
+        for coluna in esquema.colunasNumericas:
+            df[coluna.nome] = converterNumerosBrasileiros(df[coluna.nome], coluna.tipo)
+        if esquema.renomearColunas:
+            df = df.rename(columns=esquema.renomearColunas)
+
+        return df
+
+
+motorColeta = MotorColeta()
@@ -0,0 +1,39 @@
+from typing import Any, Dict, Iterable, List
+
+import pandas as pd
+
+
+def agruparItens(df: pd.DataFrame, colunaNome: str, colunaQuantidade: str, colunaPai: str,
+                 colunaEhPai: str, ignorados: Iterable[str] = (),
+                 filtrarFilhos: bool = True) -> List[Dict[str, Any]]:
+    """Monta a lista `itens`/`subitem` numa única passada sobre as linhas.
+
+    Os filhos são agrupados por categoria pai num dicionário e cada pai recebe
+    sua lista em O(1), mantendo a ordem original da tabela.
+    """
+    ignorados = set(ignorados)
+    nomes = df[colunaNome].tolist()
+    quantidades = df[colunaQuantidade].astype('int64').tolist()
+    categoriasPai = df[colunaPai].tolist()
+    ehPais = df[colunaEhPai].astype(bool).tolist()
+
+    pais = []
+    filhosPorPai: Dict[Any, List[Dict[str, Any]]] = {}
+    for nome, quantidade, categoriaPai, ehPai in zip(nomes, quantidades, categoriasPai, ehPais):
+        if ehPai:
+            if nome not in ignorados:
+                pais.append((nome, quantidade))
+        elif not (filtrarFilhos and nome in ignorados):
+            filhosPorPai.setdefault(categoriaPai, []).append({
+                "produto": nome,
+                "quantidade": quantidade
+            })
+
+    return [
+        {
+            "produto": nome,
+            "quantidade": quantidade,
+            "subitem": list(filhosPorPai.get(nome, ()))
+        }
+        for nome, quantidade in pais
+    ]
@@ -0,0 +1,257 @@
+import importlib.util
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.utils.cache import ChaveColeta, carimbarVersao
+
+PYARROW_DISPONIVEL = importlib.util.find_spec('pyarrow') is not None
+if PYARROW_DISPONIVEL:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+ORIGEM_CSV = 'csv'
+ORIGEM_RASPAGEM = 'raspagem'
+
+
+class ArmazemColunar:
+    """Armazém Parquet local: um dataset por (opcao, subopcao), particionado por ano.
+
+    Layout: `<diretorio>/<opcao>_<subopcao>/ano=<AAAA>/dados.parquet`, com as
+    mesmas colunas do DataFrame raspado. As partições vêm da ingestão dos CSVs
+    (`origem=csv`, servidas sempre) ou das raspagens (`origem=raspagem`, servidas
+    enquanto estiverem dentro do TTL da opção) e sobrevivem a reinícios.
+    """
+
+    def __init__(self, diretorio: str, habilitado: bool = True):
+        self.diretorio = diretorio
+        self.habilitado = habilitado and PYARROW_DISPONIVEL
+        # Partições já lidas: chave -> (mtime do arquivo, DataFrame carimbado)
+        self._particoes: Dict[ChaveColeta, Tuple[float, pd.DataFrame]] = {}
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.expiradas = 0
+        self.gravacoes = 0
+        self.erros = 0
+
+    def caminhoDataset(self, opcao: str, subopcao: Optional[str], *prefixos: str) -> str:
+        caminho = os.path.join(self.diretorio, *prefixos, f"{opcao}_{subopcao or 'unica'}")
+        # Salvaguarda: opção/subopção nunca apontam para fora do diretório do armazém
+        raiz = os.path.abspath(self.diretorio)
+        if os.path.commonpath([raiz, os.path.abspath(caminho)]) != raiz:
+            raise ValueError(f"Dataset fora do armazém: {opcao}/{subopcao}")
+        return caminho
+
+    def caminhoParticao(self, chave: ChaveColeta) -> str:
+        ano, opcao, subopcao = chave
+        return os.path.join(self.caminhoDataset(opcao, subopcao), f"ano={ano}", 'dados.parquet')
+
+    def caminhoAgregados(self, chave: ChaveColeta) -> str:
+        # Dataset irmão, fora dos diretórios lidos por lerDataset
+        ano, opcao, subopcao = chave
+        return os.path.join(
+            self.caminhoDataset(opcao, subopcao, 'agregados'), f"ano={ano}", 'dados.parquet'
+        )
+
+    def _gravarParquet(self, caminho: str, df: pd.DataFrame, metadados: Dict[bytes, bytes]) -> None:
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            tabela = pa.Table.from_pandas(
+                df.drop(columns='ano', errors='ignore'), preserve_index=False
+            )
+            tabela = tabela.replace_schema_metadata(
+                {**(tabela.schema.metadata or {}), **metadados}
+            )
+            # Arquivo temporário oculto + rename: leitores nunca veem uma partição pela metade
+            temporario = os.path.join(
+                os.path.dirname(caminho), f".dados.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            pq.write_table(tabela, temporario)
+            os.replace(temporario, caminho)
+            self.gravacoes += 1
+        except Exception as e:
+            self.erros += 1
+            logger.warning(f"Falha ao gravar a partição {caminho}: {e}")
+
+    def gravarParticao(self, chave: ChaveColeta, df: pd.DataFrame, origem: str,
+                       coletadoEm: Optional[float] = None) -> None:
+        if not self.habilitado:
+            return
+        if coletadoEm is None:
+            coletadoEm = time.time()
+        self._gravarParquet(self.caminhoParticao(chave), df, {
+            b'origem': origem.encode('utf-8'),
+            b'coletadoEm': repr(coletadoEm).encode('utf-8')
+        })
+
+    def gravarAgregados(self, chave: ChaveColeta, df: pd.DataFrame, versaoOrigem: str) -> None:
+        """Materializa os agregados de um ano, marcados com a versão dos dados de origem."""
+        if not self.habilitado:
+            return
+        self._gravarParquet(
+            self.caminhoAgregados(chave), df, {b'versaoOrigem': versaoOrigem.encode('utf-8')}
+        )
+
+    def obterAgregados(self, chave: ChaveColeta, versaoOrigem: str) -> Optional[pd.DataFrame]:
+        """Agregados materializados de `chave`, se calculados de `versaoOrigem` (senão None)."""
+        if not self.habilitado:
+            return None
+        caminho = self.caminhoAgregados(chave)
+        try:
+            # Confere a versão só pelo schema, sem ler os dados de uma partição desatualizada
+            metadados = pq.read_schema(caminho).metadata or {}
+            if metadados.get(b'versaoOrigem', b'').decode('utf-8') != versaoOrigem:
+                return None
+            return pq.read_table(caminho).to_pandas()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.erros += 1
+            logger.warning(f"Falha ao ler os agregados {chave} do armazém: {e}")
+            return None
+
+    def gravarSerie(self, opcao: str, subopcao: Optional[str], dados: pd.DataFrame) -> int:
+        """Grava uma série completa (coluna `ano` + colunas do DataFrame) como partições de CSV."""
+        coletadoEm = time.time()
+        particoes = 0
+        for ano, df in dados.groupby('ano', sort=True):
+            self.gravarParticao((int(ano), opcao, subopcao), df, ORIGEM_CSV, coletadoEm)
+            particoes += 1
+        return particoes
+
+    def _lerParticao(self, chave: ChaveColeta) -> Optional[pd.DataFrame]:
+        caminho = self.caminhoParticao(chave)
+        try:
+            modificadoEm = os.stat(caminho).st_mtime
+        except OSError:
+            return None
+
+        memorizada = self._particoes.get(chave)
+        if memorizada is not None and memorizada[0] == modificadoEm:
+            return memorizada[1]
+
+        tabela = pq.read_table(caminho)
+        metadados = tabela.schema.metadata or {}
+        df = carimbarVersao(tabela.to_pandas())
+        df.attrs['origem'] = metadados.get(b'origem', b'').decode('utf-8')
+        df.attrs['coletadoEm'] = float(metadados.get(b'coletadoEm', modificadoEm))
+        with self._trava:
+            self._particoes[chave] = (modificadoEm, df)
+        return df
+
+    def obterAno(self, chave: ChaveColeta,
+                 idadeMaxima: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """DataFrame de um ano, idêntico ao da raspagem, ou None se ausente ou expirado.
+
+        Partições vindas de raspagem mais antigas que `idadeMaxima` não são
+        servidas, para que a coleta as renove.
+        """
+        if not self.habilitado:
+            return None
+        try:
+            df = self._lerParticao(chave)
+        except Exception as e:
+            self.erros += 1
+            logger.warning(f"Falha ao ler a partição {chave} do armazém: {e}")
+            df = None
+        if df is None:
+            self.falhas += 1
+            return None
+        if (
+            idadeMaxima is not None
+            and df.attrs.get('origem') == ORIGEM_RASPAGEM
+            and df.attrs['coletadoEm'] + idadeMaxima <= time.time()
+        ):
+            self.expiradas += 1
+            return None
+        self.acertos += 1
+        return df.copy()
+
+    def metadados(self, chave: ChaveColeta) -> Optional[Tuple[str, float]]:
+        """Origem e instante da coleta de uma partição, sem contar como acesso."""
+        if not self.habilitado:
+            return None
+        try:
+            df = self._lerParticao(chave)
+        except Exception:
+            return None
+        return (df.attrs['origem'], df.attrs['coletadoEm']) if df is not None else None
+
+    def lerDataset(self, opcao: str, subopcao: Optional[str],
+                   anos: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """Lê vários anos numa única varredura do dataset, podando as partições por `ano`.
+
+        O resultado traz a coluna `ano`, com as linhas de cada ano na ordem gravada.
+        """
+        caminho = self.caminhoDataset(opcao, subopcao)
+        if not self.habilitado or not os.path.isdir(caminho):
+            return pd.DataFrame()
+
+        dataset = ds.dataset(caminho, format='parquet', partitioning='hive')
+        filtro = ds.field('ano').isin([int(ano) for ano in anos]) if anos is not None else None
+        tabela = dataset.to_table(filter=filtro)
+        return tabela.to_pandas().sort_values('ano', kind='stable').reset_index(drop=True)
+
+    def carregarAnos(self, opcao: str, subopcao: Optional[str], anos: Iterable[int]) -> int:
+        """Traz para a memória, numa só leitura do dataset, as partições de `anos` ainda não lidas.
+
+        Usado antes das consultas de vários anos: depois disso cada obterAno é um
+        acerto em memória. Retorna quantas partições foram lidas.
+        """
+        if not self.habilitado:
+            return 0
+        pendentes: Dict[int, float] = {}
+        for ano in anos:
+            chave = (int(ano), opcao, subopcao)
+            try:
+                modificadoEm = os.stat(self.caminhoParticao(chave)).st_mtime
+            except (OSError, ValueError):
+                continue
+            memorizada = self._particoes.get(chave)
+            if memorizada is None or memorizada[0] != modificadoEm:
+                pendentes[int(ano)] = modificadoEm
+        if not pendentes:
+            return 0
+
+        try:
+            dados = self.lerDataset(opcao, subopcao, pendentes)
+            lidas = {}
+            for ano, df in dados.groupby('ano', sort=True):
+                chave = (int(ano), opcao, subopcao)
+                # Mesma versão da leitura ano a ano: o conteúdo e os tipos são idênticos
+                df = carimbarVersao(df.drop(columns='ano').reset_index(drop=True))
+                metadados = pq.read_schema(self.caminhoParticao(chave)).metadata or {}
+                df.attrs['origem'] = metadados.get(b'origem', b'').decode('utf-8')
+                df.attrs['coletadoEm'] = float(metadados.get(b'coletadoEm', pendentes[int(ano)]))
+                lidas[chave] = (pendentes[int(ano)], df)
+        except Exception as e:
+            self.erros += 1
+            logger.warning(
+                f"Falha ao ler os anos {sorted(pendentes)} de {opcao}/{subopcao or '-'}: {e}"
+            )
+            return 0
+        with self._trava:
+            self._particoes.update(lidas)
+        return len(lidas)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "habilitado": self.habilitado,
+            "diretorio": self.diretorio,
+            "particoesEmMemoria": len(self._particoes),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "expiradas": self.expiradas,
+            "gravacoes": self.gravacoes,
+            "erros": self.erros
+        }
+
+
+armazemColunar = ArmazemColunar(Configuracao.ARMAZEM_DIRETORIO, Configuracao.ARMAZEM_HABILITADO)
@@ -0,0 +1,257 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.utils.cache_persistente import criarBackendPersistente
+from src.utils.coleta_unica import ColetaUnica
+from src.utils.compressao import comprimirVariantes
+from src.utils.revalidacao import RevalidacaoSegundoPlano
+
+ChaveColeta = Tuple[Optional[int], str, Optional[str]]
+
+
+@dataclass
+class EntradaResposta:
+    versao: Optional[str]
+    corpo: bytes
+    variantes: Dict[str, bytes]
+    cabecalhos: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class EntradaCache:
+    valor: Any
+    criadoEm: float
+    expiraEm: float
+
+
+class CacheTTL:
+    """Cache LRU em memória com TTL por opção e contadores de uso.
+
+    As chaves são tuplas (ano, opcao, subopcao); o TTL de cada entrada é
+    escolhido pela opção, permitindo expirar abas diferentes em ritmos diferentes.
+    """
+
+    def __init__(self, tamanhoMaximo: int, ttlPadrao: int,
+                 ttlPorOpcao: Optional[Dict[str, int]] = None):
+        self.tamanhoMaximo = tamanhoMaximo
+        self.ttlPadrao = ttlPadrao
+        self.ttlPorOpcao = ttlPorOpcao or {}
+        self._entradas: 'OrderedDict[Hashable, EntradaCache]' = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.expiracoes = 0
+
+    def ttlPara(self, chave: Hashable) -> int:
+        opcao = chave[1] if isinstance(chave, tuple) and len(chave) > 1 else None
+        return self.ttlPorOpcao.get(opcao, self.ttlPadrao)
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        agora = time.time()
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.falhas += 1
+                return None
+            if entrada.expiraEm <= agora:
+                del self._entradas[chave]
+                self.expiracoes += 1
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada.valor
+
+    def idade(self, chave: Hashable) -> Optional[float]:
+        """Segundos desde a gravação de uma entrada válida, sem contar como consulta."""
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada.expiraEm <= time.time():
+                return None
+            return time.time() - entrada.criadoEm
+
+    def gravar(self, chave: Hashable, valor: Any, criadoEm: Optional[float] = None) -> None:
+        if self.tamanhoMaximo <= 0:
+            return
+        if criadoEm is None:
+            criadoEm = time.time()
+        with self._trava:
+            self._entradas[chave] = EntradaCache(valor, criadoEm, criadoEm + self.ttlPara(chave))
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanhoMaximo:
+                self._entradas.popitem(last=False)
+                self.remocoes += 1
+
+    def invalidar(self, chave: Optional[Hashable] = None) -> None:
+        with self._trava:
+            if chave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(chave, None)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return {
+                "tamanho": len(self._entradas),
+                "tamanhoMaximo": self.tamanhoMaximo,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "remocoes": self.remocoes,
+                "expiracoes": self.expiracoes,
+                "taxaAcerto": round(self.acertos / consultas, 4) if consultas else 0.0
+            }
+
+
+class ChaveInvalidaError(ValueError):
+    pass
+
+
+def normalizarChave(ano: Any, opcao: Optional[str], subopcao: Optional[str]) -> ChaveColeta:
+    """Chave canônica (ano, opcao, subopcao); recusa opções e subopções que o site não tem.
+
+    A chave vira caminho no armazém colunar e parâmetro da URL da Embrapa, então
+    nenhum valor fora de `Configuracao.SUBOPCOES_POR_OPCAO` passa daqui.
+    """
+    ano_normalizado = int(ano) if ano is not None else None
+    opcao_normalizada = str(opcao).strip().lower()
+    subopcao_normalizada = str(subopcao).strip().lower() if subopcao else None
+    subopcoes = Configuracao.SUBOPCOES_POR_OPCAO.get(opcao_normalizada)
+    if subopcoes is None:
+        raise ChaveInvalidaError(f"Opção '{opcao}' não reconhecida")
+    if subopcao_normalizada is not None and subopcao_normalizada not in subopcoes:
+        raise ChaveInvalidaError(
+            f"Subopção '{subopcao}' não existe para a opção {opcao_normalizada}"
+        )
+    return (ano_normalizado, opcao_normalizada, subopcao_normalizada)
+
+
+cacheDados = CacheTTL(
+    Configuracao.CACHE_TAMANHO_MAXIMO if Configuracao.CACHE_HABILITADO else 0,
+    Configuracao.CACHE_TTL_PADRAO,
+    Configuracao.CACHE_TTL_POR_OPCAO
+)
+cachePersistente = criarBackendPersistente()
+cacheRespostas = CacheTTL(
+    Configuracao.CACHE_RESPOSTAS_TAMANHO_MAXIMO if Configuracao.CACHE_HABILITADO else 0,
+    Configuracao.CACHE_TTL_PADRAO,
+    Configuracao.CACHE_TTL_POR_OPCAO
+)
+coletaUnica = ColetaUnica(
+    (os.path.join(Configuracao.CACHE_DIRETORIO, 'travas')
+     if Configuracao.COLETA_TRAVA_ENTRE_WORKERS else None),
+    Configuracao.COLETA_TRAVA_TIMEOUT
+)
+revalidacao = RevalidacaoSegundoPlano(
+    Configuracao.CACHE_REVALIDACAO_CONCORRENCIA,
+    Configuracao.CACHE_REVALIDACAO_ESPERA_APOS_FALHA
+)
+
+
+def obterPersistente(chave: ChaveColeta) -> Optional[Any]:
+    entrada = cachePersistente.obter(chave)
+    if entrada is None:
+        return None
+    valor, gravadoEm = entrada
+    if gravadoEm + cacheDados.ttlPara(chave) <= time.time():
+        return None
+    # Promove para a memória mantendo o instante original da coleta
+    cacheDados.gravar(chave, valor, criadoEm=gravadoEm)
+    return valor
+
+
+def obterPersistenteObsoleto(chave: ChaveColeta) -> Optional[pd.DataFrame]:
+    """Última cópia em disco, mesmo vencida (até CACHE_PERSISTENTE_IDADE_MAXIMA)."""
+    entrada = cachePersistente.obter(chave)
+    if entrada is None:
+        return None
+    valor, gravadoEm = entrada
+    valor.attrs['coletadoEm'] = gravadoEm
+    return valor
+
+
+def marcarObsoleto(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df.attrs['obsoleto'] = True
+    return df
+
+
+def carimbarVersao(df: pd.DataFrame) -> pd.DataFrame:
+    # Hash do conteúdo: muda só quando a tabela coletada muda de fato
+    resumo = hashlib.sha1(','.join(map(str, df.columns)).encode('utf-8'))
+    resumo.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    df.attrs['versao'] = resumo.hexdigest()[:20]
+    df.attrs['coletadoEm'] = time.time()
+    return df
+
+
+def montarEntradaResposta(versao: Optional[str], corpo: bytes, comprimir: bool = True,
+                          cabecalhos: Optional[Dict[str, str]] = None) -> EntradaResposta:
+    # Variantes comprimidas calculadas uma vez e reaproveitadas a cada acerto
+    variantes = comprimirVariantes(corpo) if comprimir else {}
+    return EntradaResposta(versao, corpo, variantes, cabecalhos or {})
+
+
+def registrarColeta(chave: ChaveColeta, df: pd.DataFrame) -> pd.DataFrame:
+    carimbarVersao(df)
+    cacheDados.gravar(chave, df)
+    cachePersistente.gravar(chave, df)
+    return df
+
+
+def obterComCache(chave: ChaveColeta, coletar: Callable[[], Any],
+                  obterObsoleto: Optional[Callable[[], Optional[pd.DataFrame]]] = None,
+                  obterArmazenado: Optional[Callable[[], Optional[pd.DataFrame]]] = None) -> Any:
+    """Serve o DataFrame de `chave` a partir do cache, coletando-o apenas quando necessário.
+
+    A consulta passa pela memória do worker, depois pelo armazém colunar
+    (`obterArmazenado`, que promove o que acha para a memória), pelo backend persistente
+    compartilhado e só então por `coletar`; coletas concorrentes da mesma chave
+    são unificadas por `coletaUnica`.
+
+    Se existir uma cópia vencida (`obterObsoleto`), ela é servida na hora
+    enquanto a chave é renovada em segundo plano (stale-while-revalidate) e,
+    se a coleta falhar, continua valendo até CACHE_OBSOLETO_SE_ERRO segundos
+    (stale-if-error). Cópias obsoletas saem com `attrs['obsoleto'] = True`.
+    """
+    def coletarEGravar() -> Any:
+        # Outro worker pode ter preenchido o cache enquanto aguardávamos a trava
+        df = obterPersistente(chave)
+        if df is None:
+            df = registrarColeta(chave, coletar())
+        return df
+
+    df = cacheDados.obter(chave)
+    if df is None and obterArmazenado is not None:
+        df = obterArmazenado()
+    if df is None:
+        df = obterPersistente(chave)
+    if df is not None:
+        # Cópia para que os controladores não alterem o DataFrame compartilhado
+        return df.copy()
+
+    obsoleto = (obterObsoleto or (lambda: obterPersistenteObsoleto(chave)))()
+    idade = time.time() - obsoleto.attrs.get('coletadoEm', 0) if obsoleto is not None else None
+    janela = cacheDados.ttlPara(chave) + Configuracao.CACHE_OBSOLETO_REVALIDANDO
+    if idade is not None and idade <= janela:
+        revalidacao.agendar(chave, lambda: coletaUnica.executar(chave, coletarEGravar))
+        return marcarObsoleto(obsoleto)
+
+    try:
+        return coletaUnica.executar(chave, coletarEGravar).copy()
+    except Exception as e:
+        if idade is None or idade > Configuracao.CACHE_OBSOLETO_SE_ERRO:
+            raise
+        logger.warning(f"Coleta de {chave} falhou ({e}); servindo cópia de {int(idade)}s atrás")
+        revalidacao.registrarServidaPorErro()
+        return marcarObsoleto(obsoleto)
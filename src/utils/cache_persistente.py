@@ -0,0 +1,146 @@
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+
+
+class BackendPersistente:
+    """Interface dos backends em disco compartilhados entre os workers do gunicorn."""
+
+    def obter(self, chave: Hashable) -> Optional[Tuple[Any, float]]:
+        return None
+
+    def gravar(self, chave: Hashable, valor: Any) -> None:
+        pass
+
+    def invalidar(self, chave: Optional[Hashable] = None) -> None:
+        pass
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {"backend": "nenhum"}
+
+
+class BackendSQLite(BackendPersistente):
+    """Guarda os DataFrames serializados em SQLite (modo WAL) com o instante da gravação.
+
+    Cada gravação é uma transação única (INSERT OR REPLACE), então um leitor em
+    outro processo vê a entrada anterior ou a nova, nunca uma escrita parcial.
+    """
+
+    def __init__(self, caminho: str, idadeMaxima: int):
+        self.caminho = caminho
+        self.idadeMaxima = idadeMaxima
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.gravacoes = 0
+        self.erros = 0
+
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+        with self._conexao() as conexao:
+            conexao.execute(
+                "CREATE TABLE IF NOT EXISTS entradas ("
+                "chave TEXT PRIMARY KEY, valor BLOB NOT NULL, gravado_em REAL NOT NULL)"
+            )
+
+    def _conexao(self) -> sqlite3.Connection:
+        # Uma conexão por thread e por processo: sqlite3 não pode ser compartilhado após fork
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None or getattr(self._local, 'pid', None) != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=5.0)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    @staticmethod
+    def _serializarChave(chave: Hashable) -> str:
+        return json.dumps(list(chave) if isinstance(chave, tuple) else chave)
+
+    def _contar(self, contador: str) -> None:
+        with self._trava:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def obter(self, chave: Hashable) -> Optional[Tuple[Any, float]]:
+        try:
+            linha = self._conexao().execute(
+                "SELECT valor, gravado_em FROM entradas WHERE chave = ?",
+                (self._serializarChave(chave),)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao ler cache persistente: {e}")
+            self._contar('erros')
+            return None
+
+        if linha is None:
+            self._contar('falhas')
+            return None
+
+        self._contar('acertos')
+        return pickle.loads(linha[0]), linha[1]
+
+    def gravar(self, chave: Hashable, valor: Any) -> None:
+        agora = time.time()
+        blob = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            with self._conexao() as conexao:
+                conexao.execute(
+                    "INSERT OR REPLACE INTO entradas (chave, valor, gravado_em) VALUES (?, ?, ?)",
+                    (self._serializarChave(chave), sqlite3.Binary(blob), agora)
+                )
+                conexao.execute(
+                    "DELETE FROM entradas WHERE gravado_em < ?", (agora - self.idadeMaxima,)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao gravar cache persistente: {e}")
+            self._contar('erros')
+            return
+        self._contar('gravacoes')
+
+    def invalidar(self, chave: Optional[Hashable] = None) -> None:
+        try:
+            with self._conexao() as conexao:
+                if chave is None:
+                    conexao.execute("DELETE FROM entradas")
+                else:
+                    conexao.execute(
+                        "DELETE FROM entradas WHERE chave = ?", (self._serializarChave(chave),)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao invalidar cache persistente: {e}")
+            self._contar('erros')
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._trava:
+            return {
+                "backend": "sqlite",
+                "caminho": self.caminho,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "gravacoes": self.gravacoes,
+                "erros": self.erros
+            }
+
+
+def criarBackendPersistente() -> BackendPersistente:
+    backend = Configuracao.CACHE_BACKEND_PERSISTENTE
+    if not Configuracao.CACHE_HABILITADO or backend == 'nenhum':
+        return BackendPersistente()
+    if backend == 'sqlite':
+        try:
+            return BackendSQLite(
+                Configuracao.CACHE_SQLITE_CAMINHO, Configuracao.CACHE_PERSISTENTE_IDADE_MAXIMA
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Cache persistente indisponível, usando apenas memória: {e}")
+            return BackendPersistente()
+    raise ValueError(f"Backend de cache persistente '{backend}' não suportado")
@@ -0,0 +1,120 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config.configuracao import Configuracao
+from src.utils.disjuntor import disjuntorEmbrapa
+from src.utils.prazo import (
+    PrazoEsgotadoError, ServicoIndisponivelError, limitarTimeout, tempoRestante
+)
+
+STATUS_RETENTATIVA = (429, 500, 502, 503, 504)
+
+
+class ClienteHttp:
+    """Sessão HTTP única por worker, com pool de conexões keep-alive, timeouts e retentativas.
+
+    A sessão é criada sob demanda e recriada quando o processo muda (fork do
+    gunicorn), para que workers não compartilhem sockets herdados do master.
+    As retentativas ficam em `get`, não no urllib3: cada tentativa recebe só o
+    que resta do prazo da requisição, em vez de um timeout de leitura inteiro.
+    """
+
+    def __init__(self):
+        self._sessao: Optional[requests.Session] = None
+        self._pid: Optional[int] = None
+        self._trava = threading.Lock()
+
+    def _criarSessao(self) -> requests.Session:
+        adaptador = HTTPAdapter(
+            pool_connections=Configuracao.HTTP_POOL_CONEXOES,
+            pool_maxsize=Configuracao.HTTP_POOL_TAMANHO,
+            max_retries=0
+        )
+        sessao = requests.Session()
+        sessao.mount('http://', adaptador)
+        sessao.mount('https://', adaptador)
+        sessao.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'User-Agent': Configuracao.HTTP_USER_AGENT
+        })
+        return sessao
+
+    def sessao(self) -> requests.Session:
+        if self._sessao is None or self._pid != os.getpid():
+            with self._trava:
+                if self._sessao is None or self._pid != os.getpid():
+                    self._sessao = self._criarSessao()
+                    self._pid = os.getpid()
+        return self._sessao
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET com retentativas e backoff, tudo dentro do prazo da requisição em curso.
+
+        Timeout, falha de conexão ou prazo esgotado viram ServicoIndisponivelError
+        (a API responde 503 com Retry-After, ou serve a cópia obsoleta).
+        """
+        conexao, leitura = kwargs.pop(
+            'timeout', (Configuracao.HTTP_TIMEOUT_CONEXAO, Configuracao.HTTP_TIMEOUT_LEITURA)
+        )
+        for tentativa in range(Configuracao.HTTP_RETENTATIVAS + 1):
+            ultima = tentativa == Configuracao.HTTP_RETENTATIVAS
+            try:
+                # Recalculados a cada tentativa: nunca passam do que resta do prazo
+                kwargs['timeout'] = (limitarTimeout(conexao), limitarTimeout(leitura))
+                resposta = self._tentar(url, kwargs)
+            except PrazoEsgotadoError as e:
+                raise PrazoEsgotadoError(str(e), Configuracao.HTTP_TIMEOUT_LEITURA) from e
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if ultima:
+                    raise ServicoIndisponivelError(
+                        f"Sem resposta do site da Embrapa ({e})", Configuracao.HTTP_TIMEOUT_LEITURA
+                    ) from e
+                espera = self._backoff(tentativa)
+            else:
+                if resposta.status_code not in STATUS_RETENTATIVA or ultima:
+                    resposta.raise_for_status()
+                    return resposta
+                espera = max(self._backoff(tentativa), self._retryAfter(resposta))
+
+            restante = tempoRestante()
+            if restante is not None and espera >= restante:
+                raise PrazoEsgotadoError(
+                    "Prazo da requisição esgotado antes de nova tentativa no site da Embrapa",
+                    Configuracao.HTTP_TIMEOUT_LEITURA
+                )
+            time.sleep(espera)
+        raise RuntimeError(f"Retentativas esgotadas para {url}")
+
+    def _tentar(self, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        # Com o site degradado, o disjuntor falha na hora em vez de prender as threads do gunicorn
+        disjuntorEmbrapa.permitir()
+        inicio = time.monotonic()
+        try:
+            resposta = self.sessao().get(url, **kwargs)
+        except BaseException:
+            disjuntorEmbrapa.registrar(False, time.monotonic() - inicio)
+            raise
+        disjuntorEmbrapa.registrar(resposta.status_code < 500, time.monotonic() - inicio)
+        return resposta
+
+    @staticmethod
+    def _backoff(tentativa: int) -> float:
+        # Exponencial com jitter, como no coletor assíncrono
+        return Configuracao.HTTP_BACKOFF * (2 ** tentativa) * (1 + random.random())
+
+    @staticmethod
+    def _retryAfter(resposta: requests.Response) -> float:
+        try:
+            return max(0.0, float(resposta.headers.get('Retry-After', 0)))
+        except ValueError:
+            return 0.0
+
+
+clienteHttp = ClienteHttp()
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+from src.config.settings import logger
+from src.utils.prazo import PrazoEsgotadoError, tempoRestante
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos, apenas entre threads
+    fcntl = None
+
+
+class _Chamada:
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado: Any = None
+        self.erro: Optional[BaseException] = None
+
+
+class ColetaUnica:
+    """Deduplica coletas concorrentes da mesma chave (single-flight).
+
+    Dentro do worker, a primeira thread executa a coleta e as demais aguardam o
+    mesmo resultado. Entre workers, a thread líder ainda disputa uma trava de
+    arquivo por chave, para que só um processo vá ao site por vez.
+    """
+
+    def __init__(self, diretorioTravas: Optional[str], timeoutTrava: float):
+        self.diretorioTravas = diretorioTravas
+        self.timeoutTrava = timeoutTrava
+        self._emAndamento: Dict[Hashable, _Chamada] = {}
+        self._trava = threading.Lock()
+        self.execucoes = 0
+        self.compartilhadas = 0
+        self.esperasTravaArquivo = 0
+
+        if self.diretorioTravas and fcntl is not None:
+            os.makedirs(self.diretorioTravas, exist_ok=True)
+
+    def executar(self, chave: Hashable, funcao: Callable[[], Any]) -> Any:
+        with self._trava:
+            chamada = self._emAndamento.get(chave)
+            lider = chamada is None
+            if lider:
+                chamada = _Chamada()
+                self._emAndamento[chave] = chamada
+                self.execucoes += 1
+            else:
+                self.compartilhadas += 1
+
+        if not lider:
+            # Quem só aguarda a coleta de outra thread respeita o próprio prazo da requisição
+            if not chamada.evento.wait(tempoRestante()):
+                raise PrazoEsgotadoError(
+                    "Prazo da requisição esgotado aguardando a coleta em andamento"
+                )
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            with self.travaArquivo(chave):
+                chamada.resultado = funcao()
+            return chamada.resultado
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            with self._trava:
+                self._emAndamento.pop(chave, None)
+            chamada.evento.set()
+
+    @contextmanager
+    def travaArquivo(self, chave: Hashable) -> Iterator[None]:
+        if not self.diretorioTravas or fcntl is None:
+            yield
+            return
+
+        nome = hashlib.sha1(repr(chave).encode('utf-8')).hexdigest()
+        caminho = os.path.join(self.diretorioTravas, f"{nome}.lock")
+        with open(caminho, 'a') as arquivo:
+            adquirida = self._adquirir(arquivo)
+            try:
+                yield
+            finally:
+                if adquirida:
+                    fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+    def _adquirir(self, arquivo) -> bool:
+        limite = time.monotonic() + self.timeoutTrava
+        esperou = False
+        while True:
+            try:
+                fcntl.flock(arquivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if not esperou:
+                    esperou = True
+                    with self._trava:
+                        self.esperasTravaArquivo += 1
+                if time.monotonic() >= limite:
+                    # Outro worker travou por tempo demais: segue sem a trava em vez de falhar
+                    logger.warning(f"Tempo esgotado aguardando trava de coleta em {arquivo.name}")
+                    return False
+                time.sleep(0.05)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._trava:
+            return {
+                "emAndamento": len(self._emAndamento),
+                "execucoes": self.execucoes,
+                "compartilhadas": self.compartilhadas,
+                "esperasTravaArquivo": self.esperasTravaArquivo
+            }
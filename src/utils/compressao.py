@@ -0,0 +1,93 @@
+import gzip
+import zlib
+from typing import Dict, Iterable, Iterator, Optional
+
+from flask import Flask, Request, Response, request
+
+from src.config.configuracao import Configuracao
+
+try:
+    import brotli
+except ImportError:  # Brotli é opcional; sem ele oferecemos apenas gzip
+    brotli = None
+
+TIPOS_COMPRESSIVEIS = (
+    'application/json', 'application/x-ndjson', 'application/vnd.apache.arrow', 'text/'
+)
+
+
+def codificacoesDisponiveis() -> tuple:
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def comprimir(corpo: bytes, codificacao: str) -> bytes:
+    if codificacao == 'br':
+        return brotli.compress(corpo, quality=Configuracao.COMPRESSAO_NIVEL_BROTLI)
+    return gzip.compress(corpo, compresslevel=Configuracao.COMPRESSAO_NIVEL_GZIP)
+
+
+def comprimirVariantes(corpo: bytes) -> Dict[str, bytes]:
+    if len(corpo) < Configuracao.COMPRESSAO_TAMANHO_MINIMO:
+        return {}
+    return {codificacao: comprimir(corpo, codificacao) for codificacao in codificacoesDisponiveis()}
+
+
+def comprimirFluxo(blocos: Iterable[bytes], codificacao: str) -> Iterator[bytes]:
+    """Comprime uma resposta em streaming bloco a bloco, liberando cada bloco assim que chega."""
+    if codificacao == 'br':
+        compressor = brotli.Compressor(quality=Configuracao.COMPRESSAO_NIVEL_BROTLI)
+        for bloco in blocos:
+            yield compressor.process(bloco) + compressor.flush()
+        yield compressor.finish()
+        return
+
+    # wbits 31: formato gzip (cabeçalho e CRC), como gzip.compress
+    compressor = zlib.compressobj(Configuracao.COMPRESSAO_NIVEL_GZIP, zlib.DEFLATED, 31)
+    for bloco in blocos:
+        yield compressor.compress(bloco) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def escolherCodificacao(requisicao: Request) -> Optional[str]:
+    """Escolhe a codificação de maior qualidade no Accept-Encoding; br vence empates."""
+    melhor, melhorQualidade = None, 0.0
+    for codificacao in codificacoesDisponiveis():
+        qualidade = requisicao.accept_encodings[codificacao]
+        if qualidade > melhorQualidade:
+            melhor, melhorQualidade = codificacao, qualidade
+    return melhor
+
+
+def registrarCompressao(app: Flask) -> None:
+    """Comprime no after_request as respostas que ainda não vieram codificadas.
+
+    Rotas com corpo pré-comprimido (cache de respostas) já definem
+    Content-Encoding e são apenas repassadas.
+    """
+    @app.after_request
+    def comprimirResposta(resposta: Response) -> Response:
+        resposta.vary.add('Accept-Encoding')
+        if (
+            resposta.direct_passthrough
+            or resposta.is_streamed
+            or not 200 <= resposta.status_code < 300
+            or resposta.status_code == 204
+            or 'Content-Encoding' in resposta.headers
+            or not (resposta.mimetype or '').startswith(TIPOS_COMPRESSIVEIS)
+        ):
+            return resposta
+
+        codificacao = escolherCodificacao(request)
+        if codificacao is None:
+            return resposta
+
+        corpo = resposta.get_data()
+        if len(corpo) < Configuracao.COMPRESSAO_TAMANHO_MINIMO:
+            return resposta
+
+        resposta.set_data(comprimir(corpo, codificacao))
+        resposta.headers['Content-Encoding'] = codificacao
+        etag, fraca = resposta.get_etag()
+        if etag:
+            resposta.set_etag(f"{etag}-{codificacao}", weak=fraca)
+        return resposta
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.utils.prazo import ServicoIndisponivelError
+
+FECHADO = 'fechado'
+ABERTO = 'aberto'
+MEIO_ABERTO = 'meio_aberto'
+
+
+class CircuitoAbertoError(ServicoIndisponivelError):
+    pass
+
+
+class Disjuntor:
+    """Circuit breaker do acesso ao site da Embrapa (um por worker).
+
+    Fechado: as chamadas passam e o resultado das últimas `janela` é registrado;
+    falhas e chamadas mais lentas que `limiteLentidao` contam como ruins. Quando a
+    taxa de ruins atinge `taxaFalha` (com pelo menos `minimoChamadas`), o circuito
+    abre e as chamadas falham na hora por `tempoAberto` segundos. Depois disso,
+    até `sondas` chamadas de teste passam (meio aberto): se todas derem certo o
+    circuito fecha, se uma falhar ele volta a abrir.
+    """
+
+    def __init__(self, janela: int, minimoChamadas: int, taxaFalha: float, limiteLentidao: float,
+                 tempoAberto: float, sondas: int):
+        self.minimoChamadas = minimoChamadas
+        self.taxaFalha = taxaFalha
+        self.limiteLentidao = limiteLentidao
+        self.tempoAberto = tempoAberto
+        self.sondas = sondas
+        self._resultados: Deque[Tuple[bool, float]] = deque(maxlen=janela)
+        self._trava = threading.Lock()
+        self.estado = FECHADO
+        self._abertoAte = 0.0
+        self._sondasEmAndamento = 0
+        self._sondasBemSucedidas = 0
+        self.aberturas = 0
+        self.rejeitadas = 0
+        self.sucessos = 0
+        self.falhas = 0
+
+    def permitir(self) -> None:
+        """Levanta CircuitoAbertoError se a chamada não deve ir ao site agora."""
+        with self._trava:
+            if self.estado == ABERTO:
+                if time.monotonic() < self._abertoAte:
+                    self.rejeitadas += 1
+                    raise CircuitoAbertoError(
+                        "Site da Embrapa indisponível (circuito aberto)",
+                        self._abertoAte - time.monotonic()
+                    )
+                self.estado = MEIO_ABERTO
+                self._sondasEmAndamento = 0
+                self._sondasBemSucedidas = 0
+            if self.estado == MEIO_ABERTO:
+                if self._sondasEmAndamento >= self.sondas:
+                    self.rejeitadas += 1
+                    raise CircuitoAbertoError(
+                        "Site da Embrapa em teste (circuito meio aberto)", self.tempoAberto
+                    )
+                self._sondasEmAndamento += 1
+
+    def registrar(self, sucesso: bool, duracao: float) -> None:
+        ruim = not sucesso or duracao > self.limiteLentidao
+        with self._trava:
+            if sucesso:
+                self.sucessos += 1
+            else:
+                self.falhas += 1
+            if self.estado == MEIO_ABERTO:
+                self._sondasEmAndamento = max(0, self._sondasEmAndamento - 1)
+                if ruim:
+                    self._abrir()
+                else:
+                    self._sondasBemSucedidas += 1
+                    if self._sondasBemSucedidas >= self.sondas:
+                        self.estado = FECHADO
+                        self._resultados.clear()
+                        logger.info("Disjuntor fechado: site da Embrapa voltou a responder")
+                return
+
+            self._resultados.append((ruim, duracao))
+            if self.estado == FECHADO and len(self._resultados) >= self.minimoChamadas:
+                ruins = sum(1 for ruimAnterior, _ in self._resultados if ruimAnterior)
+                if ruins / len(self._resultados) >= self.taxaFalha:
+                    self._abrir()
+
+    def _abrir(self) -> None:
+        self.estado = ABERTO
+        self._abertoAte = time.monotonic() + self.tempoAberto
+        self.aberturas += 1
+        logger.warning(
+            f"Disjuntor aberto: chamadas ao site da Embrapa suspensas por {self.tempoAberto:.0f}s"
+        )
+
+    def executar(self, funcao: Callable[[], Any]) -> Any:
+        self.permitir()
+        inicio = time.monotonic()
+        try:
+            resultado = funcao()
+        except BaseException:
+            self.registrar(False, time.monotonic() - inicio)
+            raise
+        self.registrar(True, time.monotonic() - inicio)
+        return resultado
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._trava:
+            duracoes = sorted(duracao for _, duracao in self._resultados)
+            ruins = sum(1 for ruim, _ in self._resultados if ruim)
+            return {
+                "estado": self.estado,
+                "aberturas": self.aberturas,
+                "rejeitadas": self.rejeitadas,
+                "sucessos": self.sucessos,
+                "falhas": self.falhas,
+                "janela": len(self._resultados),
+                "taxaRuins": round(ruins / len(duracoes), 4) if duracoes else 0.0,
+                "latenciaP50": round(duracoes[len(duracoes) // 2], 3) if duracoes else None,
+                "latenciaP95": round(duracoes[int(len(duracoes) * 0.95)], 3) if duracoes else None
+            }
+
+
+disjuntorEmbrapa = Disjuntor(
+    Configuracao.DISJUNTOR_JANELA,
+    Configuracao.DISJUNTOR_MINIMO_CHAMADAS,
+    Configuracao.DISJUNTOR_TAXA_FALHA,
+    Configuracao.DISJUNTOR_LIMITE_LENTIDAO,
+    Configuracao.DISJUNTOR_TEMPO_ABERTO,
+    Configuracao.DISJUNTOR_SONDAS
+)
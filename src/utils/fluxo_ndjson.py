@@ -0,0 +1,29 @@
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from src.config.configuracao import Configuracao
+from src.utils.serializacao import serializarJson
+
+MIME_TYPE_NDJSON = 'application/x-ndjson'
+
+
+def registrosResultado(resultado: Dict[str, Any], **contexto: Any) -> Iterator[Dict[str, Any]]:
+    """Um registro por item de `resultado['itens']` e, por fim, um com os totais (ou o erro)."""
+    for item in resultado.get('itens', []):
+        yield {**contexto, **item}
+    yield {**contexto, **{chave: valor for chave, valor in resultado.items() if chave != 'itens'}}
+
+
+def blocosNdjson(registros: Iterable[Dict[str, Any]],
+                 tamanhoBloco: Optional[int] = None) -> Iterator[bytes]:
+    """Serializa um registro por linha, em blocos de ~`tamanhoBloco` bytes (um chunk HTTP cada)."""
+    tamanhoBloco = tamanhoBloco or Configuracao.NDJSON_TAMANHO_BLOCO
+    linhas, tamanho = [], 0
+    for registro in registros:
+        linha = serializarJson(registro) + b'\n'
+        linhas.append(linha)
+        tamanho += len(linha)
+        if tamanho >= tamanhoBloco:
+            yield b''.join(linhas)
+            linhas, tamanho = [], 0
+    if linhas:
+        yield b''.join(linhas)
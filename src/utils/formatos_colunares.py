@@ -0,0 +1,58 @@
+import importlib.util
+import io
+from typing import Dict, Optional
+
+import pandas as pd
+from flask import Request
+
+PYARROW_DISPONIVEL = importlib.util.find_spec('pyarrow') is not None
+if PYARROW_DISPONIVEL:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+MIME_TYPE_ARROW = 'application/vnd.apache.arrow.stream'
+MIME_TYPE_PARQUET = 'application/vnd.apache.parquet'
+MIME_TYPE_CSV = 'text/csv'
+
+# formato -> (mimetype, extensão do arquivo)
+FORMATOS_COLUNARES: Dict[str, tuple] = {
+    'arrow': (MIME_TYPE_ARROW, 'arrow'),
+    'parquet': (MIME_TYPE_PARQUET, 'parquet'),
+    'csv': (MIME_TYPE_CSV, 'csv'),
+}
+
+
+def formatosDisponiveis() -> tuple:
+    return ('arrow', 'parquet', 'csv') if PYARROW_DISPONIVEL else ('csv',)
+
+
+def escolherFormatoColunar(formato: str, requisicao: Request, alternativas: tuple) -> Optional[str]:
+    """Formato colunar pedido em `formato=` ou, na falta dele, preferido no Accept (senão None)."""
+    if formato in FORMATOS_COLUNARES:
+        return formato
+    mimetypes = {FORMATOS_COLUNARES[nome][0]: nome for nome in formatosDisponiveis()}
+    # `alternativas` (JSON, NDJSON) vêm primeiro para vencerem empates como */*
+    melhor = requisicao.accept_mimetypes.best_match([*alternativas, *mimetypes])
+    return mimetypes.get(melhor)
+
+
+def tabelaDados(df: pd.DataFrame, ano: int) -> pd.DataFrame:
+    """O DataFrame coletado, como está, com a coluna `ano` à frente (permite concatenar anos)."""
+    tabela = df.copy()
+    tabela.attrs = {}
+    tabela.insert(0, 'ano', ano)
+    return tabela.reset_index(drop=True)
+
+
+def serializarColunar(df: pd.DataFrame, formato: str) -> bytes:
+    if formato == 'csv':
+        return df.to_csv(index=False).encode('utf-8')
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    buffer = io.BytesIO()
+    if formato == 'parquet':
+        pq.write_table(tabela, buffer, compression='zstd')
+    else:
+        with pa.ipc.new_stream(buffer, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    return buffer.getvalue()
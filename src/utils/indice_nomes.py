@@ -0,0 +1,94 @@
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from src.utils.cache import ChaveColeta
+from src.utils.normalizacao import normalizarNome, normalizarSerie
+
+Tabela = Tuple[str, Optional[str]]
+
+
+class IndiceNomes:
+    """Índice invertido dos nomes coletados: nome normalizado -> (opcao, subopcao) -> ano -> linhas.
+
+    Cada ano de cada tabela é indexado uma vez por versão dos dados (`attrs['versao']`);
+    depois disso, achar um produto/país num ano é uma consulta a dicionário seguida de
+    `iloc`, sem percorrer a tabela. Os nomes são comparados sem acentos e sem
+    diferenciar maiúsculas (`normalizarNome`).
+    """
+
+    def __init__(self):
+        self._posicoes: Dict[str, Dict[Tabela, Dict[int, List[int]]]] = {}
+        self._versoes: Dict[ChaveColeta, Optional[str]] = {}
+        self._nomesPorChave: Dict[ChaveColeta, Set[str]] = {}
+        self._trava = threading.Lock()
+        self.indexacoes = 0
+        self.consultas = 0
+
+    def indexar(self, chave: ChaveColeta, df: pd.DataFrame, colunaNome: str) -> None:
+        versao = df.attrs.get('versao')
+        with self._trava:
+            if versao is not None and self._versoes.get(chave) == versao:
+                return
+
+        # A normalização (a parte cara) roda fora da trava, numa única passada vetorizada
+        posicoesPorNome: Dict[str, List[int]] = {}
+        for posicao, nome in enumerate(normalizarSerie(df[colunaNome]).tolist()):
+            if nome != 'total':
+                posicoesPorNome.setdefault(nome, []).append(posicao)
+
+        ano, opcao, subopcao = chave
+        with self._trava:
+            self._remover(chave)
+            for nome, posicoes in posicoesPorNome.items():
+                tabelas = self._posicoes.setdefault(nome, {})
+                tabelas.setdefault((opcao, subopcao), {})[ano] = posicoes
+            self._nomesPorChave[chave] = set(posicoesPorNome)
+            self._versoes[chave] = versao
+            self.indexacoes += 1
+
+    def _remover(self, chave: ChaveColeta) -> None:
+        ano, opcao, subopcao = chave
+        for nome in self._nomesPorChave.pop(chave, ()):
+            anos = self._posicoes.get(nome, {}).get((opcao, subopcao), {})
+            anos.pop(ano, None)
+            if not anos:
+                self._posicoes[nome].pop((opcao, subopcao), None)
+            if not self._posicoes.get(nome):
+                self._posicoes.pop(nome, None)
+
+    def indexado(self, chave: ChaveColeta) -> bool:
+        with self._trava:
+            return chave in self._versoes
+
+    def versao(self, chave: ChaveColeta) -> Optional[str]:
+        """Versão dos dados (`attrs['versao']`) indexada para `chave`."""
+        with self._trava:
+            return self._versoes.get(chave)
+
+    def localizar(self, nome: str, chave: ChaveColeta) -> List[int]:
+        """Posições (iloc) das linhas de `nome` na tabela indexada de `chave`."""
+        ano, opcao, subopcao = chave
+        with self._trava:
+            self.consultas += 1
+            anos = self._posicoes.get(normalizarNome(nome), {}).get((opcao, subopcao), {})
+            return list(anos.get(ano, ()))
+
+    def tabelas(self, nome: str) -> Dict[Tabela, List[int]]:
+        """Em quais tabelas (e anos) já indexados o nome aparece."""
+        with self._trava:
+            tabelas = self._posicoes.get(normalizarNome(nome), {})
+            return {tabela: sorted(anos) for tabela, anos in tabelas.items()}
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._trava:
+            return {
+                "nomes": len(self._posicoes),
+                "tabelasAno": len(self._versoes),
+                "indexacoes": self.indexacoes,
+                "consultas": self.consultas
+            }
+
+
+indiceNomes = IndiceNomes()
@@ -0,0 +1,21 @@
+import re
+import unicodedata
+
+import pandas as pd
+
+_ESPACOS = re.compile(r'\s+')
+
+
+def normalizarNome(texto: str) -> str:
+    """Forma canônica de um nome de produto/país: sem acentos, minúscula e com espaços simples."""
+    semAcentos = ''.join(
+        caractere for caractere in unicodedata.normalize('NFKD', str(texto))
+        if not unicodedata.combining(caractere)
+    )
+    return _ESPACOS.sub(' ', semAcentos).strip().casefold()
+
+
+def normalizarSerie(serie: pd.Series) -> pd.Series:
+    """normalizarNome aplicado a uma coluna inteira de uma vez."""
+    texto = serie.astype(str).str.normalize('NFKD').str.replace('[\u0300-\u036f]', '', regex=True)
+    return texto.str.replace(r'\s+', ' ', regex=True).str.strip().str.casefold()
@@ -0,0 +1,117 @@
+import asyncio
+import contextvars
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class PonteWsgi:
+    """Executa um app WSGI (o Flask) sob ASGI num pool de threads próprio.
+
+    Diferente de adaptadores que serializam as chamadas numa única thread, cada
+    requisição ocupa uma thread do pool só durante a renderização local; o
+    contexto (contextvars) da corrotina é propagado para a thread.
+    """
+
+    def __init__(self, appWsgi: Callable, maximoThreads: int):
+        self.appWsgi = appWsgi
+        self.maximoThreads = maximoThreads
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._trava = threading.Lock()
+
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            with self._trava:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.maximoThreads, thread_name_prefix='wsgi'
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    @staticmethod
+    def montarEnviron(scope: Dict[str, Any], corpo: bytes) -> Dict[str, Any]:
+        servidor = scope.get('server') or ('localhost', 80)
+        cliente = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            # PEP 3333: caminho como bytes decodificados em latin-1
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': str(servidor[0]),
+            'SERVER_PORT': str(servidor[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': str(cliente[0]),
+            'REMOTE_PORT': str(cliente[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(corpo),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for nome, valor in scope.get('headers', []):
+            nome = nome.decode('latin-1').upper().replace('-', '_')
+            valor = valor.decode('latin-1')
+            if nome == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = valor
+            elif nome == 'CONTENT_LENGTH':
+                environ['CONTENT_LENGTH'] = valor
+            else:
+                chave = f"HTTP_{nome}"
+                environ[chave] = f"{environ[chave]},{valor}" if chave in environ else valor
+        return environ
+
+    def _executar(self, environ: Dict[str, Any], enviar: Callable[[Dict[str, Any]], None]) -> None:
+        inicio: Dict[str, Any] = {}
+
+        def start_response(status: str, cabecalhos: List[Tuple[str, str]],
+                           exc_info: Any = None) -> Callable:
+            inicio['status'] = int(status.split(' ', 1)[0])
+            inicio['cabecalhos'] = [
+                (nome.lower().encode('latin-1'), valor.encode('latin-1'))
+                for nome, valor in cabecalhos
+            ]
+            return lambda dados: None
+
+        iteravel = self.appWsgi(environ, start_response)
+        try:
+            # Cada pedaço do iterável vira uma mensagem: respostas em streaming não são acumuladas
+            for pedaco in iteravel:
+                if not pedaco:
+                    continue
+                if inicio:
+                    enviar({'type': 'http.response.start', 'status': inicio.pop('status'),
+                            'headers': inicio.pop('cabecalhos')})
+                enviar({'type': 'http.response.body', 'body': pedaco, 'more_body': True})
+        finally:
+            if hasattr(iteravel, 'close'):
+                iteravel.close()
+        if inicio:
+            enviar({'type': 'http.response.start', 'status': inicio['status'],
+                    'headers': inicio['cabecalhos']})
+        enviar({'type': 'http.response.body', 'body': b''})
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        partes = []
+        while True:
+            mensagem = await receive()
+            partes.append(mensagem.get('body', b''))
+            if not mensagem.get('more_body'):
+                break
+
+        loop = asyncio.get_running_loop()
+
+        def enviar(mensagem: Dict[str, Any]) -> None:
+            # Chamado da thread do pool; esperar o envio dá contrapressão ao gerador da resposta
+            asyncio.run_coroutine_threadsafe(send(mensagem), loop).result()
+
+        environ = self.montarEnviron(scope, b''.join(partes))
+        contexto = contextvars.copy_context()
+        await loop.run_in_executor(self.executor(), contexto.run, self._executar, environ, enviar)
@@ -0,0 +1,82 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from flask import Flask
+
+from src.config.configuracao import Configuracao
+
+# Instante (time.monotonic) em que a requisição atual deixa de poder esperar pelo site da Embrapa
+_prazo: ContextVar[Optional[float]] = ContextVar('prazo', default=None)
+
+
+class ServicoIndisponivelError(Exception):
+    """O site da Embrapa não pode ser consultado agora; a API responde 503 em vez de esperar."""
+
+    def __init__(self, mensagem: str, tentarEm: Optional[float] = None):
+        super().__init__(mensagem)
+        self.tentarEm = tentarEm
+
+
+class PrazoEsgotadoError(ServicoIndisponivelError):
+    pass
+
+
+def iniciarPrazo(segundos: Optional[float]) -> None:
+    _prazo.set(time.monotonic() + segundos if segundos else None)
+
+
+def restringirPrazo(segundos: Optional[float]) -> None:
+    """Como iniciarPrazo, mas mantém um prazo já definido que seja mais curto."""
+    atual = _prazo.get()
+    iniciarPrazo(segundos)
+    if atual is not None and (_prazo.get() is None or atual < _prazo.get()):
+        _prazo.set(atual)
+
+
+def ampliarPrazo(segundos: float) -> None:
+    """Estende o prazo em curso para `segundos` a partir de agora (nunca o encurta).
+
+    Fora de requisições (sem prazo) e com o prazo já esgotado, nada muda: um
+    prazo esgotado de propósito (esgotarPrazo) continua esgotado.
+    """
+    prazo = _prazo.get()
+    agora = time.monotonic()
+    if prazo is None or prazo <= agora:
+        return
+    _prazo.set(max(prazo, agora + segundos))
+
+
+def esgotarPrazo() -> None:
+    """Proíbe novas idas ao site nesta requisição (a camada ASGI já coletou o que podia)."""
+    _prazo.set(time.monotonic())
+
+
+def tempoRestante() -> Optional[float]:
+    """Segundos que ainda restam no orçamento da requisição (None fora de requisições)."""
+    prazo = _prazo.get()
+    return None if prazo is None else prazo - time.monotonic()
+
+
+def limitarTimeout(timeout: float) -> float:
+    """Reduz um timeout ao que resta do orçamento; falha na hora se ele já acabou."""
+    restante = tempoRestante()
+    if restante is None:
+        return timeout
+    if restante <= 0:
+        raise PrazoEsgotadoError(
+            "Prazo da requisição esgotado antes de consultar o site da Embrapa"
+        )
+    return min(timeout, restante)
+
+
+def registrarPrazo(app: Flask) -> None:
+    """Abre, a cada requisição, um orçamento de HTTP_PRAZO_REQUISICAO segundos para o site."""
+    @app.before_request
+    def abrirPrazo() -> None:
+        # Sob ASGI a camada assíncrona já consultou o site e pode ter encurtado o prazo
+        restringirPrazo(Configuracao.HTTP_PRAZO_REQUISICAO)
+
+    @app.teardown_request
+    def encerrarPrazo(_erro: Optional[BaseException] = None) -> None:
+        iniciarPrazo(None)
@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+from src.config.configuracao import Configuracao
+from src.config.settings import logger
+from src.utils.cache import ChaveColeta, ChaveInvalidaError, normalizarChave
+
+
+class RegistroAcessos:
+    """Conta os acessos por (ano, opcao, subopcao) para priorizar as chaves mais requisitadas.
+
+    Cada worker mantém o próprio contador e o publica em `<diretorio>/<pid>.json`;
+    quem precisa do ranking global soma os arquivos de todos os workers.
+    """
+
+    def __init__(self, diretorio: Optional[str], idadeMaximaArquivo: int = 7 * 86400):
+        self.diretorio = diretorio
+        self.idadeMaximaArquivo = idadeMaximaArquivo
+        self._contador: Counter = Counter()
+        self._trava = threading.Lock()
+
+    def registrar(self, chave: ChaveColeta) -> None:
+        with self._trava:
+            self._contador[chave] += 1
+
+    def persistir(self) -> None:
+        if not self.diretorio:
+            return
+        with self._trava:
+            itens = [[*chave, acessos] for chave, acessos in self._contador.items()]
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            caminho = os.path.join(self.diretorio, f"{os.getpid()}.json")
+            temporario = f"{caminho}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                json.dump(itens, arquivo)
+            os.replace(temporario, caminho)
+        except OSError as e:
+            logger.warning(f"Falha ao publicar o registro de acessos: {e}")
+
+    def maisRequisitadas(self, quantidade: int) -> List[ChaveColeta]:
+        with self._trava:
+            total = Counter() if self.diretorio else Counter(self._contador)
+        if self.diretorio and os.path.isdir(self.diretorio):
+            limite = time.time() - self.idadeMaximaArquivo
+            for nome in os.listdir(self.diretorio):
+                if not nome.endswith('.json'):
+                    continue
+                caminho = os.path.join(self.diretorio, nome)
+                try:
+                    if os.stat(caminho).st_mtime < limite:
+                        # Arquivo de um worker que já não existe
+                        os.remove(caminho)
+                        continue
+                    with open(caminho, encoding='utf-8') as arquivo:
+                        itens = json.load(arquivo)
+                    for ano, opcao, subopcao, acessos in itens:
+                        try:
+                            chave = normalizarChave(ano, opcao, subopcao)
+                        except ChaveInvalidaError:
+                            # Gravada antes da validação das chaves: não vira pré-aquecimento
+                            continue
+                        total[chave] += acessos
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Registro de acessos ilegível em {caminho}: {e}")
+        return [chave for chave, _ in total.most_common(quantidade)]
+
+
+registroAcessos = RegistroAcessos(os.path.join(Configuracao.CACHE_DIRETORIO, 'acessos'))
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from src.config.settings import logger
+
+
+class RevalidacaoSegundoPlano:
+    """Renova em segundo plano as chaves servidas obsoletas (stale-while-revalidate).
+
+    Cada chave tem no máximo uma renovação em andamento por worker; após uma
+    falha, novas tentativas da mesma chave aguardam `esperaAposFalha` segundos
+    para não martelar um site que está fora do ar.
+    """
+
+    def __init__(self, maximoSimultaneas: int, esperaAposFalha: float):
+        self.maximoSimultaneas = maximoSimultaneas
+        self.esperaAposFalha = esperaAposFalha
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._emAndamento: set = set()
+        self._falhasRecentes: Dict[Hashable, float] = {}
+        self._trava = threading.Lock()
+        self.agendadas = 0
+        self.concluidas = 0
+        self.falhas = 0
+        self.servidasObsoletas = 0
+        self.servidasPorErro = 0
+
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            with self._trava:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.maximoSimultaneas, thread_name_prefix='revalidacao'
+                    )
+                    self._pid = os.getpid()
+                    self._emAndamento = set()
+        return self._executor
+
+    def reservar(self, chave: Hashable) -> bool:
+        """Marca `chave` como em renovação; False se já em andamento ou em espera."""
+        self.executor()
+        with self._trava:
+            if chave in self._emAndamento:
+                return False
+            if time.time() - self._falhasRecentes.get(chave, 0) < self.esperaAposFalha:
+                return False
+            self._emAndamento.add(chave)
+            self.agendadas += 1
+        return True
+
+    def liberar(self, chave: Hashable, erro: Optional[BaseException] = None) -> None:
+        with self._trava:
+            self._emAndamento.discard(chave)
+            if erro is None:
+                self.concluidas += 1
+                self._falhasRecentes.pop(chave, None)
+            else:
+                self.falhas += 1
+                self._falhasRecentes[chave] = time.time()
+
+    def agendar(self, chave: Hashable, funcao: Callable[[], Any]) -> bool:
+        with self._trava:
+            self.servidasObsoletas += 1
+        if not self.reservar(chave):
+            return False
+        self.executor().submit(self._executar, chave, funcao)
+        return True
+
+    def _executar(self, chave: Hashable, funcao: Callable[[], Any]) -> None:
+        try:
+            funcao()
+        except Exception as e:
+            logger.warning(f"Falha ao revalidar {chave} em segundo plano: {e}")
+            self.liberar(chave, e)
+        else:
+            self.liberar(chave)
+
+    def registrarServidaPorErro(self) -> None:
+        with self._trava:
+            self.servidasPorErro += 1
+
+    def estatisticas(self) -> Dict[str, Any]:
+        with self._trava:
+            return {
+                "emAndamento": len(self._emAndamento),
+                "agendadas": self.agendadas,
+                "concluidas": self.concluidas,
+                "falhas": self.falhas,
+                "servidasObsoletas": self.servidasObsoletas,
+                "servidasPorErro": self.servidasPorErro
+            }
@@ -0,0 +1,35 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usamos o json da biblioteca padrão
+    orjson = None
+
+
+def _converterPadrao(obj: Any) -> Any:
+    # Escalares e arrays NumPy chegam aqui apenas no caminho sem orjson
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+
+
+def serializarJson(obj: Any, indentado: bool = False) -> bytes:
+    """Serializa `obj` para JSON UTF-8 compacto (ou indentado) já em bytes.
+
+    Tipos NumPy são aceitos diretamente, dispensando a conversão recursiva
+    prévia com `converterTiposNumpy`.
+    """
+    if orjson is not None:
+        opcoes = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indentado:
+            opcoes |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=opcoes)
+
+    if indentado:
+        texto = json.dumps(obj, ensure_ascii=False, indent=2, default=_converterPadrao)
+    else:
+        texto = json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_converterPadrao)
+    return texto.encode('utf-8')
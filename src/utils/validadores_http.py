@@ -0,0 +1,60 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from flask import Request, Response
+
+CODIFICACOES_ETAG = ('gzip', 'br')
+
+
+def calcularEtag(versao: Optional[str], *variantes: Any) -> Optional[str]:
+    """ETag da representação: hash da versão dos dados mais os parâmetros de formatação."""
+    if not versao:
+        return None
+    base = ':'.join([versao, *map(str, variantes)])
+    return hashlib.sha1(base.encode('utf-8')).hexdigest()[:20]
+
+
+def naoModificado(requisicao: Request, etag: Optional[str], coletadoEm: Optional[float]) -> bool:
+    # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110, 13.2.2)
+    if requisicao.if_none_match:
+        if etag is None:
+            return False
+        candidatas = [etag] + [f"{etag}-{codificacao}" for codificacao in CODIFICACOES_ETAG]
+        return requisicao.if_none_match.star_tag or any(
+            requisicao.if_none_match.contains_weak(candidata) for candidata in candidatas
+        )
+
+    if requisicao.if_modified_since and coletadoEm is not None:
+        return int(coletadoEm) <= int(requisicao.if_modified_since.timestamp())
+
+    return False
+
+
+def aplicarValidadores(resposta: Response, etag: Optional[str], coletadoEm: Optional[float],
+                       maxAge: Optional[int], codificacao: Optional[str] = None) -> Response:
+    if etag:
+        # Cada codificação é uma representação diferente e recebe a sua própria ETag
+        codificacao = codificacao or resposta.headers.get('Content-Encoding')
+        resposta.set_etag(f"{etag}-{codificacao}" if codificacao else etag)
+    if coletadoEm is not None:
+        resposta.last_modified = datetime.fromtimestamp(int(coletadoEm), tz=timezone.utc)
+    if maxAge is not None:
+        resposta.cache_control.public = True
+        resposta.cache_control.max_age = max(0, int(maxAge))
+    resposta.vary.add('Accept-Encoding')
+    return resposta
+
+
+def sinalizarObsoleto(resposta: Response, coletadoEm: Optional[float]) -> Response:
+    """Marca uma resposta servida a partir de uma cópia vencida (RFC 9111: Age e Warning 110)."""
+    if coletadoEm is not None:
+        resposta.headers['Age'] = str(max(0, int(time.time() - coletadoEm)))
+    resposta.headers['Warning'] = '110 - "Response is Stale"'
+    return resposta
+
+
+def respostaNaoModificada(etag: Optional[str], coletadoEm: Optional[float], maxAge: Optional[int],
+                          codificacao: Optional[str] = None) -> Response:
+    return aplicarValidadores(Response(status=304), etag, coletadoEm, maxAge, codificacao)
@@ -0,0 +1,21 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Definido antes de importar src: cache, armazém e travas num diretório descartável e
+# nenhuma thread do agendador indo ao site da Embrapa durante os testes
+DIRETORIO_TESTES = tempfile.mkdtemp(prefix='embrapa-testes-')
+os.environ['CACHE_DIRETORIO'] = DIRETORIO_TESTES
+os.environ['AGENDADOR_HABILITADO'] = 'False'
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(DIRETORIO_TESTES, ignore_errors=True)
+
+
+@pytest.fixture
+def cliente():
+    from app import app
+    return app.test_client()
@@ -0,0 +1,102 @@
+import math
+
+import pandas as pd
+import pytest
+
+from src.services.agregados import calcularAgregados, registrosAgregados
+from src.services.consulta_tabela import ColunasOpcao
+from src.services.motor_coleta import ESQUEMAS
+
+COLUNAS_EXPORTACAO = ColunasOpcao.doEsquema(ESQUEMAS['opt_06'])
+COLUNAS_PROCESSAMENTO = ColunasOpcao.doEsquema(ESQUEMAS['opt_03'])
+
+
+def exportacao(linhas):
+    return pd.DataFrame(linhas, columns=['pais', 'quantidade', 'valor'])
+
+
+def processamento(linhas):
+    return pd.DataFrame(linhas, columns=['processo', 'volume', 'categoriaPai', 'ehPai'])
+
+
+def porProduto(agregados):
+    return agregados.set_index('produto')
+
+
+def test_participacao_variacao_ranking_e_preco_por_kg():
+    atual = exportacao([
+        ('Alemanha', 100, 300.0), ('Brasil', 300, 500.0), ('Chile', 0, 0.0), ('Total', 400, 800.0)
+    ])
+    anterior = exportacao([('ALEMANHA ', 50, 100.0), ('Brasil', 300, 400.0), ('Total', 350, 500.0)])
+    agregados = porProduto(calcularAgregados(atual, anterior, COLUNAS_EXPORTACAO))
+
+    assert agregados.loc['Alemanha', 'participacao'] == pytest.approx(0.25)
+    assert agregados.loc['Brasil', 'participacaoValor'] == pytest.approx(0.625)
+    assert agregados.loc['Total', 'participacao'] == pytest.approx(1.0)
+    # Casamento entre anos pelo nome normalizado
+    assert agregados.loc['Alemanha', 'variacaoAnual'] == pytest.approx(1.0)
+    assert agregados.loc['Alemanha', 'variacaoAnualValor'] == pytest.approx(2.0)
+    assert agregados.loc['Brasil', 'variacaoAnual'] == pytest.approx(0.0)
+    assert math.isnan(agregados.loc['Chile', 'variacaoAnual'])
+    assert agregados['ranking'].tolist()[:3] == [2, 1, 3]
+    assert pd.isna(agregados.loc['Total', 'ranking'])
+    assert agregados.loc['Alemanha', 'precoKg'] == pytest.approx(3.0)
+    assert math.isnan(agregados.loc['Chile', 'precoKg'])
+
+
+def test_sem_ano_anterior_a_variacao_fica_nula():
+    atual = exportacao([('Chile', 10, 20.0), ('Total', 10, 20.0)])
+    agregados = calcularAgregados(atual, None, COLUNAS_EXPORTACAO)
+    assert agregados['variacaoAnual'].isna().all()
+    assert agregados['variacaoAnualValor'].isna().all()
+
+
+def test_item_zerado_no_ano_anterior_nao_tem_variacao():
+    atual = exportacao([('Chile', 10, 20.0), ('Total', 10, 20.0)])
+    anterior = exportacao([('Chile', 0, 0.0), ('Total', 0, 0.0)])
+    agregados = porProduto(calcularAgregados(atual, anterior, COLUNAS_EXPORTACAO))
+    assert math.isnan(agregados.loc['Chile', 'variacaoAnual'])
+
+
+def test_hierarquia_ranqueia_categorias_e_filhos_separadamente():
+    atual = processamento([
+        ('TINTAS', 40, None, True), ('Cabernet', 10, 'TINTAS', False),
+        ('Merlot', 30, 'TINTAS', False), ('BRANCAS', 20, None, True),
+        ('Chardonnay', 20, 'BRANCAS', False)
+    ])
+    agregados = porProduto(calcularAgregados(atual, None, COLUNAS_PROCESSAMENTO))
+
+    assert agregados.loc['TINTAS', 'ranking'] == 1
+    assert agregados.loc['BRANCAS', 'ranking'] == 2
+    assert agregados.loc['Merlot', 'ranking'] == 1
+    assert agregados.loc['Cabernet', 'ranking'] == 2
+    assert agregados.loc['Chardonnay', 'ranking'] == 1
+    assert agregados.loc['Merlot', 'categoria'] == 'TINTAS'
+    assert pd.isna(agregados.loc['TINTAS', 'categoria'])
+    # Sem linha Total, a participação divide pela soma das categorias
+    assert agregados.loc['TINTAS', 'participacao'] == pytest.approx(40 / 60)
+    assert 'precoKg' not in agregados.columns
+
+
+def test_registros_separam_o_total_e_trocam_nan_por_none():
+    atual = exportacao([
+        ('Alemanha', 100, 300.0), ('Brasil', 300, 500.0), ('Chile', 0, 0.0), ('Total', 400, 800.0)
+    ])
+    agregados = calcularAgregados(atual, None, COLUNAS_EXPORTACAO)
+    total, itens = registrosAgregados(agregados, top=2)
+
+    assert total['produto'] == 'Total' and 'ranking' not in total
+    assert [item['produto'] for item in itens] == ['Brasil', 'Alemanha']
+    assert itens[0]['variacaoAnual'] is None
+
+
+def test_top_corta_as_categorias_antes_dos_produtos():
+    atual = processamento([
+        ('TINTAS', 40, None, True), ('Cabernet', 10, 'TINTAS', False),
+        ('Merlot', 30, 'TINTAS', False), ('BRANCAS', 20, None, True),
+        ('Chardonnay', 20, 'BRANCAS', False)
+    ])
+    agregados = calcularAgregados(atual, None, COLUNAS_PROCESSAMENTO)
+    _, itens = registrosAgregados(agregados, top=1)
+
+    assert [item['produto'] for item in itens] == ['TINTAS', 'Merlot']
@@ -0,0 +1,92 @@
+import os
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from src.config.configuracao import Configuracao
+from src.utils import cliente_http
+from src.utils.cliente_http import ClienteHttp
+from src.utils.disjuntor import Disjuntor
+from src.utils.prazo import ServicoIndisponivelError, iniciarPrazo
+
+URL = 'http://embrapa.teste/index.php?ano=2023&opcao=opt_02'
+
+
+class AdaptadorFalso(BaseAdapter):
+    """Responde com os status pedidos ou, sem eles, trava até o timeout de leitura."""
+
+    def __init__(self, status=()):
+        super().__init__()
+        self.status = list(status)
+        self.envios = 0
+
+    def send(self, request, timeout=None, **kwargs):
+        self.envios += 1
+        if not self.status:
+            time.sleep(timeout[1])
+            raise requests.ReadTimeout(f"leitura excedeu {timeout[1]:.2f}s")
+        resposta = requests.Response()
+        resposta.status_code = self.status.pop(0)
+        resposta._content = b'ok'
+        resposta.url = request.url
+        resposta.request = request
+        return resposta
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    # Disjuntor próprio, para as falhas simuladas não abrirem o do worker
+    monkeypatch.setattr(cliente_http, 'disjuntorEmbrapa', Disjuntor(
+        janela=10, minimoChamadas=10, taxaFalha=1.0, limiteLentidao=60.0,
+        tempoAberto=60.0, sondas=1
+    ))
+    monkeypatch.setattr(Configuracao, 'HTTP_RETENTATIVAS', 2)
+    monkeypatch.setattr(Configuracao, 'HTTP_BACKOFF', 0.01)
+
+    def montar(adaptador):
+        cliente = ClienteHttp()
+        cliente._sessao = requests.Session()
+        cliente._sessao.mount('http://', adaptador)
+        cliente._pid = os.getpid()
+        return cliente
+
+    yield montar
+    iniciarPrazo(None)
+
+
+def test_site_travado_respeita_o_prazo_da_requisicao(cliente):
+    adaptador = AdaptadorFalso()
+    iniciarPrazo(1.0)
+    inicio = time.monotonic()
+    with pytest.raises(ServicoIndisponivelError) as erro:
+        cliente(adaptador).get(URL, timeout=(0.5, 0.6))
+    duracao = time.monotonic() - inicio
+
+    assert duracao < 1.2
+    assert adaptador.envios == 2
+    assert erro.value.tentarEm is not None
+
+
+def test_timeout_sem_prazo_vira_servico_indisponivel(cliente):
+    adaptador = AdaptadorFalso()
+    with pytest.raises(ServicoIndisponivelError):
+        cliente(adaptador).get(URL, timeout=(0.05, 0.05))
+    assert adaptador.envios == Configuracao.HTTP_RETENTATIVAS + 1
+
+
+def test_repete_status_transitorios(cliente):
+    adaptador = AdaptadorFalso(status=[503, 502, 200])
+    assert cliente(adaptador).get(URL).status_code == 200
+    assert adaptador.envios == 3
+
+
+def test_erro_do_cliente_nao_e_repetido(cliente):
+    adaptador = AdaptadorFalso(status=[404])
+    with pytest.raises(requests.HTTPError):
+        cliente(adaptador).get(URL)
+    assert adaptador.envios == 1
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from src.utils.coleta_unica import ColetaUnica
+from src.utils.prazo import PrazoEsgotadoError, iniciarPrazo
+
+
+def test_seguidores_compartilham_o_resultado_do_lider():
+    coleta = ColetaUnica(None, 1.0)
+    liberar = threading.Event()
+    resultados = []
+
+    def coletar():
+        liberar.wait(5)
+        return 'dados'
+
+    lider = threading.Thread(target=lambda: resultados.append(coleta.executar('chave', coletar)))
+    lider.start()
+    while not coleta.estatisticas()['emAndamento']:
+        time.sleep(0.01)
+    seguidor = threading.Thread(target=lambda: resultados.append(coleta.executar('chave', coletar)))
+    seguidor.start()
+    while not coleta.compartilhadas:
+        time.sleep(0.01)
+    liberar.set()
+    lider.join(5)
+    seguidor.join(5)
+    assert resultados == ['dados', 'dados']
+    assert coleta.execucoes == 1
+
+
+def test_seguidor_desiste_quando_o_prazo_acaba():
+    coleta = ColetaUnica(None, 1.0)
+    liberar = threading.Event()
+    lider = threading.Thread(target=coleta.executar, args=('chave', lambda: liberar.wait(5)))
+    lider.start()
+    while not coleta.estatisticas()['emAndamento']:
+        time.sleep(0.01)
+    try:
+        iniciarPrazo(0.2)
+        inicio = time.monotonic()
+        with pytest.raises(PrazoEsgotadoError):
+            coleta.executar('chave', lambda: 'nunca')
+        assert time.monotonic() - inicio < 1
+    finally:
+        iniciarPrazo(None)
+        liberar.set()
+        lider.join(5)
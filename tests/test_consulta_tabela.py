@@ -0,0 +1,56 @@
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from src.services.consulta_tabela import (
+    ConsultaInvalidaError, ParametrosConsulta, criarCursor, lerCursor
+)
+
+
+def consulta(**argumentos):
+    return ParametrosConsulta.deArgumentos(MultiDict(argumentos))
+
+
+def test_sem_argumentos_a_consulta_fica_inativa():
+    parametros = consulta()
+    assert parametros == ParametrosConsulta()
+    assert not parametros.ativa
+    assert not parametros.paginada
+
+
+def test_le_nomes_campos_e_paginacao():
+    argumentos = MultiDict([
+        ('nome', 'Chile| Argentina '), ('nome', 'Uruguai'), ('campos', 'produto, valor'),
+        ('ordenar', '-quantidade'), ('top', '10'), ('limite', '5'), ('deslocamento', '15')
+    ])
+    parametros = ParametrosConsulta.deArgumentos(argumentos)
+    assert parametros.nomes == ('Chile', 'Argentina', 'Uruguai')
+    assert parametros.campos == ('produto', 'valor')
+    assert parametros.ordenar == '-quantidade'
+    assert (parametros.top, parametros.limite, parametros.deslocamento) == (10, 5, 15)
+    assert parametros.ativa and parametros.paginada
+
+
+@pytest.mark.parametrize('argumentos', [
+    {'campos': 'produto,preco'},
+    {'ordenar': 'pais'},
+    {'limite': 'dez'},
+    {'top': '-1'},
+    {'deslocamento': '-5'},
+    {'cursor': 'nao-e-um-cursor'},
+    {'cursor': criarCursor(3)[:-1] + '!'},
+])
+def test_argumentos_invalidos(argumentos):
+    with pytest.raises(ConsultaInvalidaError):
+        consulta(**argumentos)
+
+
+def test_cursor_substitui_o_deslocamento():
+    assert lerCursor(criarCursor(40)) == 40
+    assert consulta(deslocamento='5', cursor=criarCursor(40)).deslocamento == 40
+
+
+def test_ordenar_por_valor_exige_aba_com_valor():
+    parametros = consulta(ordenar='valor')
+    parametros.validarOpcao('opt_06')
+    with pytest.raises(ConsultaInvalidaError):
+        parametros.validarOpcao('opt_02')
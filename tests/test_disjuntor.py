@@ -0,0 +1,116 @@
+import pytest
+
+from src.config.configuracao import Configuracao
+from src.services.coleta_paralela import ColetaParalela
+from src.utils.disjuntor import ABERTO, FECHADO, MEIO_ABERTO, CircuitoAbertoError, Disjuntor
+from src.utils.prazo import ampliarPrazo, esgotarPrazo, iniciarPrazo, tempoRestante
+
+
+def criarDisjuntor(tempoAberto=60.0, sondas=1):
+    return Disjuntor(janela=4, minimoChamadas=4, taxaFalha=0.5, limiteLentidao=1.0,
+                     tempoAberto=tempoAberto, sondas=sondas)
+
+
+def chamar(disjuntor, sucesso, duracao=0.1):
+    disjuntor.permitir()
+    disjuntor.registrar(sucesso, duracao)
+
+
+def test_fechado_ate_o_minimo_de_chamadas():
+    disjuntor = criarDisjuntor()
+    for _ in range(3):
+        chamar(disjuntor, False)
+    assert disjuntor.estado == FECHADO
+
+
+def test_abre_na_taxa_de_falhas_e_rejeita_enquanto_aberto():
+    disjuntor = criarDisjuntor()
+    for sucesso in (True, True, False, False):
+        chamar(disjuntor, sucesso)
+    assert disjuntor.estado == ABERTO
+    with pytest.raises(CircuitoAbertoError) as erro:
+        disjuntor.permitir()
+    assert 0 < erro.value.tentarEm <= 60
+    assert disjuntor.rejeitadas == 1
+
+
+def test_chamadas_lentas_contam_como_ruins():
+    disjuntor = criarDisjuntor()
+    for duracao in (0.1, 0.1, 5.0, 5.0):
+        chamar(disjuntor, True, duracao)
+    assert disjuntor.estado == ABERTO
+
+
+def test_meio_aberto_limita_as_sondas_e_fecha_apos_sucesso():
+    disjuntor = criarDisjuntor(tempoAberto=0.0, sondas=1)
+    for _ in range(4):
+        chamar(disjuntor, False)
+    disjuntor.permitir()
+    assert disjuntor.estado == MEIO_ABERTO
+    with pytest.raises(CircuitoAbertoError):
+        disjuntor.permitir()
+    disjuntor.registrar(True, 0.1)
+    assert disjuntor.estado == FECHADO
+    assert disjuntor.estatisticas()['janela'] == 0
+
+
+def test_sonda_com_falha_reabre():
+    disjuntor = criarDisjuntor(tempoAberto=0.0, sondas=2)
+    for _ in range(4):
+        chamar(disjuntor, False)
+    chamar(disjuntor, True)
+    assert disjuntor.estado == MEIO_ABERTO
+    chamar(disjuntor, False)
+    assert disjuntor.estado == ABERTO
+    assert disjuntor.aberturas == 2
+
+
+def test_executar_devolve_a_vaga_de_sonda_em_excecoes():
+    disjuntor = criarDisjuntor(tempoAberto=0.0, sondas=1)
+    for _ in range(4):
+        chamar(disjuntor, False)
+
+    def interromper():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        disjuntor.executar(interromper)
+    # A sonda falhou e reabriu o circuito; a próxima chamada pode sondar de novo
+    assert disjuntor.estado == ABERTO
+    assert disjuntor.executar(lambda: 'ok') == 'ok'
+    assert disjuntor.estado == FECHADO
+
+
+def test_ampliar_prazo_so_estende_prazo_em_curso():
+    try:
+        iniciarPrazo(None)
+        ampliarPrazo(30)
+        assert tempoRestante() is None
+
+        iniciarPrazo(5)
+        ampliarPrazo(30)
+        assert 29 < tempoRestante() <= 30
+        ampliarPrazo(1)
+        assert tempoRestante() > 29
+
+        esgotarPrazo()
+        ampliarPrazo(30)
+        assert tempoRestante() <= 0
+    finally:
+        iniciarPrazo(None)
+
+
+def test_intervalo_ganha_um_prazo_por_rodada_ate_o_teto():
+    coleta = ColetaParalela(maximoSimultaneas=4)
+    prazo = Configuracao.HTTP_PRAZO_REQUISICAO
+    try:
+        iniciarPrazo(prazo)
+        coleta.ampliarPrazoPara(8)
+        esperado = min(prazo * 2, Configuracao.HTTP_PRAZO_INTERVALO_MAXIMO)
+        assert esperado - 1 < tempoRestante() <= esperado
+
+        iniciarPrazo(prazo)
+        coleta.ampliarPrazoPara(400)
+        assert tempoRestante() <= Configuracao.HTTP_PRAZO_INTERVALO_MAXIMO
+    finally:
+        iniciarPrazo(None)
@@ -0,0 +1,44 @@
+import pandas as pd
+
+from src.routes import rotas
+from src.services.motor_coleta import ESQUEMAS, motorColeta
+from src.utils.cache import normalizarChave, registrarColeta
+from src.utils.indice_nomes import indiceNomes
+
+
+def registrarAno(ano, linhas):
+    chave = normalizarChave(ano, 'opt_06', 'subopt_01')
+    df = registrarColeta(chave, pd.DataFrame(linhas, columns=['pais', 'quantidade', 'valor']))
+    motorColeta.indexarNomes(ESQUEMAS['opt_06'], chave, df)
+    return chave
+
+
+def test_indice_acompanha_a_versao_registrada():
+    chave = registrarAno(2001, [('Paraguai', 10, 20.0), ('Total', 10, 20.0)])
+    versao = indiceNomes.versao(chave)
+    assert indiceNomes.localizar('PARAGUAI', chave) == [0]
+
+    registrarAno(2001, [('Chile', 5, 5.0), ('Paraguai', 10, 20.0), ('Total', 15, 25.0)])
+    assert indiceNomes.versao(chave) != versao
+    assert indiceNomes.localizar('paraguai', chave) == [1]
+
+
+def test_serie_so_abre_os_anos_em_que_o_nome_aparece(cliente, monkeypatch):
+    registrarAno(2002, [('Uruguai', 7, 14.0), ('Total', 7, 14.0)])
+    registrarAno(2003, [('Chile', 3, 6.0), ('Total', 3, 6.0)])
+    abertos = []
+    coletarDados = rotas.coletar_dados
+
+    def coletarRegistrando(opcao, ano, subopcao=None):
+        abertos.append(ano)
+        return coletarDados(opcao, ano, subopcao)
+
+    monkeypatch.setattr(rotas, 'coletar_dados', coletarRegistrando)
+    resposta = cliente.get(
+        '/serie?nome=uruguai&opcao=opt_06&subopcao=subopt_01&ano_inicio=2002&ano_fim=2003'
+    )
+
+    assert resposta.status_code == 200
+    assert [ponto['ano'] for ponto in resposta.get_json()['serie']] == [2002]
+    assert abertos == [2002]
+    assert resposta.headers.get('ETag')
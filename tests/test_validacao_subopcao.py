@@ -0,0 +1,68 @@
+import pytest
+
+from src.routes.rotas_assincronas import chavesDaRequisicao
+from src.services.motor_coleta import ESQUEMAS, motorColeta
+from src.utils.armazem_colunar import ArmazemColunar
+from src.utils.cache import ChaveInvalidaError, normalizarChave
+
+
+def test_normalizar_chave_canoniza_opcao_e_subopcao():
+    assert normalizarChave('2023', ' OPT_05 ', ' Subopt_01 ') == (2023, 'opt_05', 'subopt_01')
+    assert normalizarChave(2023, 'opt_02', None) == (2023, 'opt_02', None)
+
+
+@pytest.mark.parametrize('opcao, subopcao', [
+    ('opt_05', 'subopt_99'),
+    ('opt_05', '../../etc'),
+    ('opt_03', 'subopt_05'),
+    # Produção e comercialização não têm subopções
+    ('opt_02', 'subopt_01'),
+    ('opt_04', 'subopt_01'),
+])
+def test_normalizar_chave_recusa_subopcao_desconhecida(opcao, subopcao):
+    with pytest.raises(ChaveInvalidaError):
+        normalizarChave(2023, opcao, subopcao)
+
+
+def test_normalizar_chave_recusa_opcao_desconhecida():
+    with pytest.raises(ChaveInvalidaError):
+        normalizarChave(2023, 'opt_99', None)
+
+
+def test_motor_recusa_subopcao_antes_de_ir_ao_site():
+    with pytest.raises(ChaveInvalidaError):
+        motorColeta.coletar(ESQUEMAS['opt_06'], 2023, opcao='opt_06', subopcao='subopt_99')
+
+
+def test_url_da_embrapa_codifica_os_parametros():
+    url = motorColeta.montarUrl(2023, 'opt_05', 'subopt_01')
+    assert 'ano=2023' in url and 'opcao=opt_05' in url and 'subopcao=subopt_01' in url
+    assert 'subopcao=a%26b' in motorColeta.montarUrl(2023, 'opt_05', 'a&b')
+
+
+def test_caminho_dataset_nao_sai_do_armazem(tmp_path):
+    armazem = ArmazemColunar(str(tmp_path))
+    assert armazem.caminhoDataset('opt_05', 'subopt_01').startswith(str(tmp_path))
+    with pytest.raises(ValueError):
+        armazem.caminhoDataset('opt_05', 'x/../../../fora')
+
+
+def test_chaves_da_requisicao_ignora_subopcao_invalida():
+    assert chavesDaRequisicao({'opcao': ['opt_05'], 'subopcao': ['subopt_99']}) == []
+    assert chavesDaRequisicao({'opcao': ['opt_02'], 'subopcao': ['subopt_01']}) == []
+    assert chavesDaRequisicao({'opcao': ['opt_05'], 'ano': ['2022']}) == [
+        (2022, 'opt_05', ESQUEMAS['opt_05'].subopcaoPadrao)
+    ]
+
+
+@pytest.mark.parametrize('rota', [
+    '/embrapa_data?ano=2023&opcao=opt_05&subopcao=subopt_99',
+    '/embrapa_data?ano=2023&opcao=opt_02&subopcao=subopt_01',
+    '/embrapa_data?ano_inicio=2020&ano_fim=2023&opcao=opt_06&subopcao=../../x',
+    '/serie?nome=Chile&opcao=opt_06&subopcao=subopt_99',
+    '/agregados?ano=2023&opcao=opt_03&subopcao=subopt_05',
+])
+def test_rotas_respondem_400_para_subopcao_invalida(cliente, rota):
+    resposta = cliente.get(rota)
+    assert resposta.status_code == 400
+    assert 'subopcoes_validas' in resposta.get_json()